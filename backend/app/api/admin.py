@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, status
+
+from app.models.schemas import ReloadResponse, ReloadStatus
+from app.services.executor import compute
+from app.services.reload import reloader
+from app.services.singleflight import flight_stats
+
+router = APIRouter(prefix="/admin")
+
+
+@router.post("/reload", response_model=ReloadResponse, status_code=status.HTTP_202_ACCEPTED)
+async def reload_prices() -> ReloadResponse:
+    started = reloader.trigger()
+    return ReloadResponse(started=started, status=reloader.status())
+
+
+@router.post("/merge", response_model=ReloadResponse, status_code=status.HTTP_202_ACCEPTED)
+async def merge_partitions() -> ReloadResponse:
+    started = reloader.trigger("incremental")
+    return ReloadResponse(started=started, status=reloader.status())
+
+
+@router.get("/reload", response_model=ReloadStatus)
+async def reload_status() -> ReloadStatus:
+    return ReloadStatus(**reloader.status())
+
+
+@router.get("/compute")
+async def compute_status() -> dict:
+    """Compute pool task counts and executed/coalesced counts of the single-flight groups."""
+    return {
+        "threads": compute.threads,
+        "processes": compute.processes,
+        "pools": compute.stats(),
+        "singleflight": flight_stats(),
+    }
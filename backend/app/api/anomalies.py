@@ -1,47 +1,207 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Query
+from dataclasses import asdict
+from functools import partial
+from typing import Optional
 
-from app.models.schemas import AnomalyResponse
-from app.services.anomaly import detect_anomalies
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+
+from app.api.responses import binary_response, copy_response, json_response, negotiate_binary
+from app.core.metrics import request_phase
+from app.models.schemas import AnomalyEventsResponse, AnomalyResponse, AnomalyScanResponse
+from app.services.anomaly import detect_series_anomalies, empty_anomalies, scan_anomalies
+from app.services.detectors import detector_names
+from app.services.executor import compute
+from app.services.singleflight import AsyncSingleFlight
 from app.services.storage import store
+from app.services.streaming import detector
 
 router = APIRouter(prefix="/anomalies")
 
+_SCAN_COLUMNS = ("commodity", "region", "date", "price", "z_score")
+
+# Identical concurrent JSON requests share one compute task and its body.
+_requests = AsyncSingleFlight("anomalies.requests")
+
+
+_METHOD_HELP = "Scoring method: zscore (rolling mean/std), mad (rolling median/MAD), ewma, or seasonal"
+
+
+def _check_method(method: str) -> None:
+    if method not in detector_names():
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown method {method!r}; expected one of {', '.join(detector_names())}",
+        )
+
+
+def _json(model: BaseModel) -> Response:
+    """Serialize on the worker, so the event loop only sends bytes."""
+    return json_response(model.model_dump(mode="json"))
+
+
+async def _run(fn, *args, media_type: Optional[str]) -> Response:
+    """``fn(*args, media_type)`` on the compute pool; JSON results are coalesced.
+
+    Binary responses stream from a generator, so each request builds its own.
+    """
+    if media_type is not None:
+        return await compute.run(fn, *args, media_type)
+    key = (fn.__name__, store.version, *args)
+    return copy_response(await _requests.do(key, partial(compute.run, fn, *args, None)))
+
+
+def _metadata(
+    commodity: Optional[str],
+    region: Optional[str],
+    window: int,
+    z: float,
+    method: str,
+) -> dict[str, str]:
+    metadata = {"window": str(window), "threshold": str(z), "method": method}
+    if commodity is not None:
+        metadata.update(commodity=commodity, region=region)
+    return metadata
+
 
 @router.get("", response_model=AnomalyResponse)
-def get_anomalies(
+async def get_anomalies(
+    request: Request,
     commodity: str = Query(...),
     region: str = Query(...),
     window: int = Query(12, ge=3, le=52),
     z: float = Query(2.0, ge=1.0, le=5.0),
+    method: str = Query("zscore", description=_METHOD_HELP),
 ) -> AnomalyResponse:
-    if store.prices is None:
-        return AnomalyResponse(
-            region=region,
-            commodity=commodity,
-            window=window,
-            threshold=z,
-            points=[],
+    _check_method(method)
+    media_type = negotiate_binary(request)
+    return await _run(_series_anomalies, commodity, region, window, z, method, media_type=media_type)
+
+
+def _series_anomalies(
+    commodity: str,
+    region: str,
+    window: int,
+    z: float,
+    method: str,
+    media_type: Optional[str],
+) -> Response:
+    index = store.index
+    if index is None or (commodity, region) not in index.slices:
+        if media_type is not None:
+            return binary_response(empty_anomalies(), media_type, _metadata(commodity, region, window, z, method))
+        return _json(
+            AnomalyResponse(
+                region=region,
+                commodity=commodity,
+                window=window,
+                threshold=z,
+                method=method,
+                points=[],
+            )
+        )
+
+    anomalies = detect_series_anomalies(index, commodity, region, window=window, z_threshold=z, method=method)
+    if media_type is not None:
+        return binary_response(anomalies, media_type, _metadata(commodity, region, window, z, method))
+
+    with request_phase("anomalies", "serialize"):
+        points = [
+            {
+                "date": row.date.date(),
+                "price": float(row.price),
+                "z_score": float(row.z_score),
+            }
+            for row in anomalies.itertuples()
+        ]
+        return _json(
+            AnomalyResponse(
+                region=region,
+                commodity=commodity,
+                window=window,
+                threshold=z,
+                method=method,
+                points=points,
+            )
         )
 
-    df = store.prices
-    filtered = df[(df["commodity"] == commodity) & (df["region"] == region)]
-    anomalies = detect_anomalies(filtered[["date", "price"]], window=window, z_threshold=z)
-
-    points = [
-        {
-            "date": row.date.date(),
-            "price": float(row.price),
-            "z_score": float(row.z_score),
-        }
-        for row in anomalies.itertuples()
-    ]
-
-    return AnomalyResponse(
-        region=region,
-        commodity=commodity,
+
+@router.get("/scan", response_model=AnomalyScanResponse)
+async def scan_all_anomalies(
+    request: Request,
+    commodity: Optional[list[str]] = Query(None, description="Restrict to these commodities"),
+    region: Optional[list[str]] = Query(None, description="Restrict to these regions"),
+    window: int = Query(12, ge=3, le=52),
+    z: float = Query(2.0, ge=1.0, le=5.0),
+    top_k: Optional[int] = Query(None, ge=1, description="Keep only the K largest |z| points"),
+    method: str = Query("zscore", description=_METHOD_HELP),
+) -> AnomalyScanResponse:
+    _check_method(method)
+    media_type = negotiate_binary(request)
+    return await _run(
+        _scan,
+        None if commodity is None else tuple(commodity),
+        None if region is None else tuple(region),
+        window,
+        z,
+        top_k,
+        method,
+        media_type=media_type,
+    )
+
+
+def _scan(
+    commodity: Optional[tuple[str, ...]],
+    region: Optional[tuple[str, ...]],
+    window: int,
+    z: float,
+    top_k: Optional[int],
+    method: str,
+    media_type: Optional[str],
+) -> Response:
+    index = store.index
+    if index is None:
+        if media_type is not None:
+            return binary_response(empty_anomalies(_SCAN_COLUMNS), media_type, _metadata(None, None, window, z, method))
+        return _json(AnomalyScanResponse(window=window, threshold=z, method=method, points=[]))
+
+    anomalies = scan_anomalies(
+        index,
         window=window,
-        threshold=z,
-        points=points,
+        z_threshold=z,
+        commodities=commodity,
+        regions=region,
+        top_k=top_k,
+        method=method,
+    )
+    if media_type is not None:
+        return binary_response(anomalies, media_type, _metadata(None, None, window, z, method))
+
+    with request_phase("anomalies.scan", "serialize"):
+        points = [
+            {
+                "commodity": row.commodity,
+                "region": row.region,
+                "date": row.date.date(),
+                "price": float(row.price),
+                "z_score": float(row.z_score),
+            }
+            for row in anomalies.itertuples()
+        ]
+        return _json(AnomalyScanResponse(window=window, threshold=z, method=method, points=points))
+
+
+@router.get("/events", response_model=AnomalyEventsResponse)
+async def anomaly_events(
+    since: int = Query(0, ge=0, description="Only events after this sequence number"),
+    limit: Optional[int] = Query(None, ge=1),
+) -> AnomalyEventsResponse:
+    """Anomalies raised by the streaming detector as new prices were merged."""
+    events = detector.events_since(since, limit)
+    return AnomalyEventsResponse(
+        window=detector.window,
+        threshold=detector.z_threshold,
+        last_seq=events[-1].seq if events else max(since, detector.last_seq),
+        events=[asdict(event) for event in events],
     )
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Query, Request, Response
+
+from app.api.responses import ARROW_STREAM, binary_response, iso_dates, json_response, negotiate_binary
+from app.core.metrics import request_phase
+from app.models.schemas import CompareResponse
+from app.services.comparison import RegionComparison, compare_regions
+from app.services.executor import compute
+from app.services.storage import store
+
+router = APIRouter(prefix="/compare")
+
+
+def _nullable(values: np.ndarray) -> list:
+    """Nested lists of floats with NaN as None, so JSON gets null."""
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def _payload(result: RegionComparison, normalized: bool) -> dict:
+    dispersion = result.dispersion()
+    stats = result.region_stats()
+    return {
+        "commodity": result.commodity,
+        "unit": result.unit,
+        "normalized": normalized,
+        "regions": result.regions,
+        "dates": iso_dates(result.dates),
+        "matrix": _nullable(result.matrix),
+        "correlation": _nullable(result.correlation),
+        "mean_spread": _nullable(result.mean_spread),
+        "spread": {name: _nullable(values) for name, values in dispersion.items()},
+        "stats": [
+            {
+                "region": row["region"],
+                "unit": row["unit"],
+                "observations": int(row["observations"]),
+                **{name: None if np.isnan(row[name]) else float(row[name]) for name in ("mean", "min", "max", "last", "premium")},
+            }
+            for row in stats.to_dict("records")
+        ],
+    }
+
+
+@router.get(
+    "",
+    response_model=CompareResponse,
+    responses={200: {"content": {ARROW_STREAM: {}}}},
+)
+async def compare_prices(
+    request: Request,
+    commodity: str = Query(...),
+    region: Optional[list[str]] = Query(None, description="Regions to compare (default: all with the commodity)"),
+    start: Optional[date] = Query(None, description="First date to include"),
+    end: Optional[date] = Query(None, description="Last date to include"),
+    normalized: bool = Query(False, description="Compare roubles per base unit instead of published prices"),
+) -> Response:
+    """Date-aligned prices of one commodity across regions, with correlations and spreads."""
+    media_type = negotiate_binary(request)
+    return await compute.run(_comparison, commodity, region, start, end, normalized, media_type)
+
+
+def _comparison(
+    commodity: str,
+    region: Optional[list[str]],
+    start: Optional[date],
+    end: Optional[date],
+    normalized: bool,
+    media_type: Optional[str],
+) -> Response:
+    index = store.index
+    if index is None:
+        result = RegionComparison(
+            commodity=commodity,
+            regions=[],
+            units=[],
+            dates=np.empty(0, dtype="datetime64[D]"),
+            matrix=np.empty((0, 0)),
+            correlation=np.empty((0, 0)),
+            mean_spread=np.empty((0, 0)),
+        )
+    else:
+        with request_phase("compare", "compute"):
+            result = compare_regions(index, commodity, region, start, end, normalized)
+
+    if media_type is not None:
+        return binary_response(result.wide_frame(), media_type, {"commodity": commodity})
+    with request_phase("compare", "serialize"):
+        return json_response(_payload(result, normalized), headers={"Vary": "Accept"})
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Callable, Optional
+
+from app.services.storage import DataStore
+
+# Versions restart at every process start, so the boot token keeps an ETag
+# issued before a restart (or by another worker) from matching new data.
+_BOOT_TOKEN = os.urandom(8).hex()
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag.removeprefix("W/") for candidate in candidates
+    )
+
+
+class ConditionalGetMiddleware:
+    """ETag/Cache-Control for GET responses derived from the dataset version.
+
+    Every GET under ``prefix`` depends only on the loaded prices and the
+    request itself, so its ETag is a hash of the store version, path, query
+    string and the negotiation headers. A matching ``If-None-Match`` is
+    answered with 304 before the endpoint runs at all.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        store: DataStore,
+        prefix: str = "/api",
+        exclude: tuple[str, ...] = (),
+        max_age: int = 0,
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.prefix = prefix
+        self.exclude = exclude
+        self.cache_control = f"public, max-age={max_age}, must-revalidate".encode()
+
+    def _etag(self, scope: dict, headers: dict[bytes, bytes]) -> str:
+        digest = hashlib.blake2b(digest_size=12)
+        for part in (
+            _BOOT_TOKEN.encode(),
+            str(self.store.version).encode(),
+            scope["path"].encode(),
+            scope.get("query_string", b""),
+            headers.get(b"accept", b""),
+            headers.get(b"accept-encoding", b""),
+        ):
+            digest.update(part)
+            digest.update(b"\0")
+        return f'W/"{digest.hexdigest()}"'
+
+    def _applies(self, scope: dict) -> bool:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return False
+        path = scope["path"]
+        return path.startswith(self.prefix) and not path.startswith(self.exclude)
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        etag = self._etag(scope, headers)
+        if_none_match: Optional[bytes] = headers.get(b"if-none-match")
+        if if_none_match is not None and _matches(if_none_match.decode("latin-1"), etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [
+                    (b"etag", etag.encode()),
+                    (b"cache-control", self.cache_control),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_etag(message: dict) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                response_headers = list(message.get("headers", []))
+                names = {name.lower() for name, _ in response_headers}
+                if b"etag" not in names:
+                    response_headers.append((b"etag", etag.encode()))
+                if b"cache-control" not in names:
+                    response_headers.append((b"cache-control", self.cache_control))
+                message = {**message, "headers": response_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
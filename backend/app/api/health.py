@@ -4,5 +4,5 @@ router = APIRouter()
 
 
 @router.get("/health")
-def health_check() -> dict:
+async def health_check() -> dict:
     return {"status": "ok"}
@@ -1,37 +1,58 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+from datetime import date
+from typing import Any, Callable, Optional
 
-from app.models.schemas import CommodityList, RegionList, DashboardSummary
-from app.services.storage import store
+from fastapi import APIRouter, Query, Request, Response
+import numpy as np
+import pandas as pd
+
+from app.api.responses import ARROW_STREAM, binary_response, iso_dates, json_response, negotiate_binary
+from app.models.schemas import CommodityList, RegionList, DashboardSummary, SummaryCubeResponse
+from app.services.cache import LRUCache
+from app.services.cube import CELL_COLUMNS, summary_cube
+from app.services.executor import compute
+from app.services.storage import PriceIndex, store
 
 router = APIRouter()
 
+# Larger cube slices are serialized on the compute pool, off the event loop.
+_INLINE_CELLS = 2_000
 
-@router.get("/commodities", response_model=CommodityList)
-def list_commodities() -> CommodityList:
-    if store.prices is None:
+_metadata_cache = LRUCache(maxsize=8, name="metadata")
+store.add_reload_listener(_metadata_cache.clear)
+
+
+def _memoized(name: str, build: Callable[[PriceIndex], Any]) -> Any:
+    """Compute a metadata result once per loaded dataset."""
+    index = store.index
+    cached = _metadata_cache.get(name)
+    if cached is not None and cached[0] is index:
+        return cached[1]
+    value = build(index)
+    _metadata_cache.put(name, (index, value))
+    return value
+
+
+def _commodities(index: PriceIndex) -> CommodityList:
+    if index is None:
         return CommodityList(items=[])
-    items = sorted(store.prices["commodity"].unique().tolist())
-    return CommodityList(items=items)
+    return CommodityList(items=sorted({commodity for commodity, _ in index.slices}))
 
 
-@router.get("/regions", response_model=RegionList)
-def list_regions() -> RegionList:
-    if store.prices is None:
+def _regions(index: PriceIndex) -> RegionList:
+    if index is None:
         return RegionList(items=[])
-    items = sorted(store.prices["region"].unique().tolist())
-    return RegionList(items=items)
+    return RegionList(items=sorted({region for _, region in index.slices}))
 
 
-@router.get("/summary", response_model=DashboardSummary)
-def dashboard_summary() -> DashboardSummary:
-    if store.prices is None or store.prices.empty:
+def _summary(index: PriceIndex) -> DashboardSummary:
+    if index is None or index.frame.empty:
         return DashboardSummary(cards=[])
 
-    latest_date = store.prices["date"].max().date()
-    commodity_count = store.prices["commodity"].nunique()
-    region_count = store.prices["region"].nunique()
+    latest_date = pd.Timestamp(index.dates.max()).date()
+    commodity_count = len({commodity for commodity, _ in index.slices})
+    region_count = len({region for _, region in index.slices})
     return DashboardSummary(
         cards=[
             {"label": "Latest data", "value": str(latest_date)},
@@ -39,3 +60,60 @@ def dashboard_summary() -> DashboardSummary:
             {"label": "Regions", "value": str(region_count)},
         ]
     )
+
+
+@router.get("/commodities", response_model=CommodityList)
+async def list_commodities() -> CommodityList:
+    return _memoized("commodities", _commodities)
+
+
+@router.get("/regions", response_model=RegionList)
+async def list_regions() -> RegionList:
+    return _memoized("regions", _regions)
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def dashboard_summary() -> DashboardSummary:
+    return _memoized("summary", _summary)
+
+
+@router.get(
+    "/summary/cube",
+    response_model=SummaryCubeResponse,
+    responses={200: {"content": {ARROW_STREAM: {}}}},
+)
+async def summary_cube_cells(
+    request: Request,
+    commodity: Optional[list[str]] = Query(None, description="Restrict to these commodities"),
+    region: Optional[list[str]] = Query(None, description="Restrict to these regions"),
+    start: Optional[date] = Query(None, description="First month to include"),
+    end: Optional[date] = Query(None, description="Last month to include"),
+) -> Response:
+    """Monthly count/mean/min/max/last/std/YoY per commodity and region, from the materialized cube."""
+    cube = summary_cube.cube
+    keys = [
+        key
+        for key in cube.slices
+        if (commodity is None or key[0] in commodity) and (region is None or key[1] in region)
+    ]
+    ranges = [cube.slice(c, r, start, end) for c, r in keys]
+    rows = np.concatenate([np.arange(r.start, r.stop) for r in ranges]) if ranges else np.empty(0, dtype=np.int64)
+    cells = cube.cells.iloc[rows]
+    media_type = negotiate_binary(request)
+    if len(cells) > _INLINE_CELLS:
+        return await compute.run(_cube_response, cells, media_type)
+    return _cube_response(cells, media_type)
+
+
+def _cube_response(cells: pd.DataFrame, media_type: Optional[str]) -> Response:
+    if media_type is not None:
+        frame = cells[CELL_COLUMNS].assign(month=cells["month"].to_numpy().astype("datetime64[ns]"))
+        return binary_response(frame, media_type)
+
+    columns = {name: cells[name].to_numpy() for name in CELL_COLUMNS}
+    columns["month"] = iso_dates(columns["month"].astype("datetime64[D]"))
+    for name in ("std", "yoy"):
+        columns[name] = np.where(np.isnan(columns[name]), None, columns[name])
+    lists = {name: values if isinstance(values, list) else values.tolist() for name, values in columns.items()}
+    payload = {"cells": [dict(zip(CELL_COLUMNS, values)) for values in zip(*(lists[name] for name in CELL_COLUMNS))]}
+    return json_response(payload, headers={"Vary": "Accept"})
@@ -0,0 +1,138 @@
+"""
+``/metrics`` endpoint and the request middleware that feeds it.
+
+The middleware records an in-flight gauge and a latency histogram per route
+template (``/api/prices``, not the raw path, so label cardinality stays
+bounded; requests answered before routing, such as 304s and 404s, count as
+``other``). Store size, cache hit ratios, compute pool and single-flight
+counters are read from their owners at scrape time.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterable
+
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, Family, Gauge, Histogram, registry, sample
+from app.services.cache import cache_stats
+from app.services.executor import compute
+from app.services.singleflight import flight_stats
+from app.services.storage import store
+
+HTTP_LATENCY = Histogram(
+    "fpt_http_request_duration_seconds",
+    "HTTP request latency until the last body chunk is sent",
+    ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "fpt_http_requests_in_flight",
+    "HTTP requests being handled",
+    ("method",),
+)
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus text exposition of every registered metric."""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+def _route_template(scope: dict) -> str:
+    """Path template of the route that handled ``scope`` (set while routing), or ``other``."""
+    # Routes of included routers only know their path below the prefix; FastAPI
+    # records the full template on the effective route context.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path_format", None) or getattr(scope.get("route"), "path", None)
+    if path is None:
+        return "other"
+    return path or "/"
+
+
+class MetricsMiddleware:
+    """Latency histogram per route and in-flight gauge for every HTTP request."""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec(method=method)
+            HTTP_LATENCY.observe(
+                time.perf_counter() - started, method=method, route=_route_template(scope), status=status
+            )
+
+
+_store_bytes: dict[str, int] = {}
+
+
+def _store_size() -> Iterable[Family]:
+    df = store.prices
+    if _store_bytes.get("version") != store.version:
+        # Deep memory usage walks object columns; once per dataset version.
+        _store_bytes.update(version=store.version, bytes=0 if df is None else int(df.memory_usage(deep=True).sum()))
+    yield "fpt_store_rows", "gauge", "Rows in the loaded price table", [sample(0 if df is None else len(df))]
+    yield "fpt_store_bytes", "gauge", "Memory used by the loaded price table", [sample(_store_bytes["bytes"])]
+    yield "fpt_store_version", "gauge", "Dataset version, bumped by every reload or merge", [sample(store.version)]
+
+
+def _caches() -> Iterable[Family]:
+    stats = cache_stats()
+    for field, kind, help in (
+        ("hits", "counter", "Cache lookups that found an entry"),
+        ("misses", "counter", "Cache lookups that found nothing"),
+        ("hit_ratio", "gauge", "Share of cache lookups that found an entry"),
+        ("size", "gauge", "Entries in the cache"),
+    ):
+        name = f"fpt_cache_{field}" + ("_total" if kind == "counter" else "")
+        yield name, kind, help, [sample(s[field], cache=cache) for cache, s in stats.items()]
+
+
+def _pools() -> Iterable[Family]:
+    stats = compute.stats()
+    yield "fpt_compute_tasks_total", "counter", "Compute pool tasks by outcome", [
+        sample(s[outcome], pool=pool, outcome=outcome)
+        for pool, s in stats.items()
+        for outcome in ("submitted", "completed", "failed", "rejected")
+    ]
+    for field, help in (
+        ("queued", "Compute tasks waiting for a worker"),
+        ("running", "Compute tasks running"),
+        ("workers", "Compute pool workers"),
+    ):
+        yield f"fpt_compute_{field}", "gauge", help, [sample(s[field], pool=pool) for pool, s in stats.items()]
+
+
+def _flights() -> Iterable[Family]:
+    stats = flight_stats()
+    yield "fpt_singleflight_calls_total", "counter", "Coalesced calls: executed once or joined an identical call", [
+        sample(s[outcome], group=group, outcome=outcome)
+        for group, s in stats.items()
+        for outcome in ("executed", "coalesced", "failed")
+    ]
+    yield "fpt_singleflight_in_flight", "gauge", "Distinct calls being computed", [
+        sample(s["in_flight"], group=group) for group, s in stats.items()
+    ]
+
+
+for _collector in (_store_size, _caches, _pools, _flights):
+    registry.add_collector(_collector)
@@ -1,51 +1,184 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Query
+from datetime import date
+from functools import partial
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 import pandas as pd
 
-from app.models.schemas import PriceSeries
+from app.api.responses import (
+    ARROW_STREAM,
+    PARQUET,
+    accepts_gzip,
+    binary_response,
+    copy_response,
+    encode_binary,
+    gzip_chunks,
+    json_response,
+    negotiate_binary,
+    pa,
+    price_series_payload,
+)
+from app.core.metrics import request_phase
+from app.models.schemas import PriceSeries, PriceSeriesColumnar
+from app.services.downsampling import OHLC_COLUMNS, Aggregate, Resolution, downsample_series
+from app.services.executor import compute
+from app.services.export import EXPORT_COLUMNS, encode_csv, encode_ndjson, iter_price_chunks
+from app.services.singleflight import AsyncSingleFlight
 from app.services.storage import store
 
 router = APIRouter(prefix="/prices")
 
+PRICE_COLUMNS = ["date", "region", "commodity", "price", "unit"]
+
+# Identical concurrent JSON requests share one compute task and its body.
+_requests = AsyncSingleFlight("prices.requests")
+
+_EMPTY = pd.DataFrame(
+    {
+        "date": pd.Series(dtype="datetime64[ns]"),
+        "region": pd.Series(dtype="object"),
+        "commodity": pd.Series(dtype="object"),
+        "price": pd.Series(dtype="float64"),
+        "unit": pd.Series(dtype="object"),
+    }
+)
+
 
-@router.get("", response_model=PriceSeries)
-def get_prices(
+@router.get(
+    "",
+    response_model=PriceSeries,
+    responses={
+        200: {
+            "description": "PriceSeries, or PriceSeriesColumnar when format=columnar",
+            "content": {ARROW_STREAM: {}},
+        }
+    },
+)
+async def get_prices(
+    request: Request,
     commodity: str = Query(...),
     region: str = Query(...),
-    window: int = Query(None, description="Last N months to retrieve (None = all)"),
-) -> PriceSeries:
-    if store.prices is None:
-        return PriceSeries(region=region, commodity=commodity, unit="", records=[])
-
-    df = store.prices
-    filtered = df[(df["commodity"] == commodity) & (df["region"] == region)]
-    
-    # Apply time window filter if specified
-    if window is not None and window > 0 and not filtered.empty:
-        # Convert to datetime if needed
-        filtered_copy = filtered.copy()
-        filtered_copy["date"] = pd.to_datetime(filtered_copy["date"])
-        
-        # Get the max date in data and calculate cutoff from there
-        max_date = filtered_copy["date"].max()
-        cutoff_date = max_date - timedelta(days=window * 30)
-        filtered = filtered_copy[filtered_copy["date"] >= cutoff_date]
-    
-    if filtered.empty:
-        return PriceSeries(region=region, commodity=commodity, unit="", records=[])
-
-    unit = filtered["unit"].iloc[0]
-    records = [
-        {
-            "date": row.date.date() if hasattr(row.date, 'date') else row.date,
-            "region": row.region,
-            "commodity": row.commodity,
-            "price": float(row.price),
-            "unit": row.unit,
-        }
-        for row in filtered.itertuples()
-    ]
+    window: Optional[int] = Query(None, description="Last N calendar months to retrieve (None = all)"),
+    start: Optional[date] = Query(None, description="First date to include"),
+    end: Optional[date] = Query(None, description="Last date to include"),
+    format: Literal["rows", "columnar"] = Query(
+        "rows",
+        description="rows: one record per date; columnar: parallel date/price arrays",
+    ),
+    resolution: Optional[Resolution] = Query(
+        None,
+        description="Aggregate to calendar weeks or months (None = raw points)",
+    ),
+    aggregate: Aggregate = Query(
+        "mean",
+        description="With resolution: mean price, or open/high/low/close per period",
+    ),
+    max_points: Optional[int] = Query(
+        None,
+        ge=3,
+        description="Reduce to at most this many points with LTTB downsampling",
+    ),
+) -> Response:
+    """One series, raw or downsampled; built on the compute pool."""
+    media_type = negotiate_binary(request)
+    args = (commodity, region, window, start, end, format, resolution, aggregate, max_points, media_type)
+    if media_type is not None:
+        return await compute.run(_price_series, *args)
+    response = await _requests.do((store.version, *args), partial(compute.run, _price_series, *args))
+    return copy_response(response)
+
+
+def _price_series(
+    commodity: str,
+    region: str,
+    window: Optional[int],
+    start: Optional[date],
+    end: Optional[date],
+    format: str,
+    resolution: Optional[Resolution],
+    aggregate: Aggregate,
+    max_points: Optional[int],
+    media_type: Optional[str],
+) -> Response:
+    columnar = format == "columnar"
+    months = window if window is not None and window > 0 else None
+    index = store.index
+    bounds = None if index is None else index.slices.get((commodity, region))
+    if bounds is None:
+        filtered = _EMPTY
+    else:
+        with request_phase("prices", "filter"):
+            rows = index.date_range(bounds, start, end, months)
+            if resolution is None and max_points is None:
+                filtered = index.frame.iloc[rows]
+        if resolution is not None or max_points is not None:
+            with request_phase("prices", "compute"):
+                filtered = downsample_series(index, rows, resolution, aggregate, max_points)
+
+    if media_type is not None:
+        # Arrow/Parquet encoding happens while the response streams.
+        return binary_response(
+            filtered[PRICE_COLUMNS + [c for c in OHLC_COLUMNS if c in filtered.columns]],
+            media_type,
+            {"region": region, "commodity": commodity},
+        )
+    with request_phase("prices", "serialize"):
+        return json_response(
+            price_series_payload(filtered, region, commodity, columnar),
+            headers={"Vary": "Accept"},
+        )
+
+
+_EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "arrow": (ARROW_STREAM, "arrows"),
+    "parquet": (PARQUET, "parquet"),
+}
+
+
+@router.get(
+    "/export",
+    responses={200: {"content": {media_type: {} for media_type, _ in _EXPORT_FORMATS.values()}}},
+)
+def export_prices(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson", "arrow", "parquet"]] = Query(
+        None,
+        description="Defaults to Arrow/Parquet if the Accept header asks for it, else CSV",
+    ),
+    commodity: Optional[list[str]] = Query(None, description="Restrict to these commodities"),
+    region: Optional[list[str]] = Query(None, description="Restrict to these regions"),
+    start: Optional[date] = Query(None, description="First date to include"),
+    end: Optional[date] = Query(None, description="Last date to include"),
+    gzip: Optional[bool] = Query(None, description="Compress on the fly (default: if Accept-Encoding allows it)"),
+) -> Response:
+    """Stream the price table chunk by chunk, optionally filtered and gzipped."""
+    if format is None:
+        media_type = negotiate_binary(request)
+        format = {ARROW_STREAM: "arrow", PARQUET: "parquet"}.get(media_type, "csv")
+    if format in ("arrow", "parquet") and pa is None:
+        raise HTTPException(status_code=501, detail="Binary export requires pyarrow on the server")
+    media_type, extension = _EXPORT_FORMATS[format]
+
+    index = store.index
+    chunks = iter(()) if index is None else iter_price_chunks(index, commodity, region, start, end)
+    if format == "csv":
+        body = encode_csv(chunks)
+    elif format == "ndjson":
+        body = encode_ndjson(chunks)
+    else:
+        empty = (_EMPTY if index is None else index.frame.iloc[:0])[EXPORT_COLUMNS]
+        body = encode_binary(chunks, media_type, empty)
 
-    return PriceSeries(region=region, commodity=commodity, unit=unit, records=records)
+    headers = {
+        "Content-Disposition": f'attachment; filename="prices.{extension}"',
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if gzip if gzip is not None else accepts_gzip(request):
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -0,0 +1,225 @@
+"""
+Fast-path responses for large series.
+
+Routers that return long series build their payload straight from the store's
+column arrays and serialize it in one call, skipping per-row pydantic models
+and FastAPI's second validation pass. Output matches what the declared
+response models would produce.
+
+Bulk clients can instead ask for Arrow IPC stream (or Parquet) through the
+Accept header; those responses stream record batches built from the frame's
+columns, so no JSON is produced or parsed at all.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.services.downsampling import OHLC_COLUMNS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - binary formats need pyarrow
+    pa = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+BINARY_FORMATS = (ARROW_STREAM, PARQUET)
+BATCH_ROWS = 64 * 1024
+
+
+def json_response(
+    payload: Any,
+    status_code: int = 200,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def copy_response(response: Response) -> Response:
+    """Same status, headers and body in a new object.
+
+    A coalesced response is sent to several clients, and middleware (CORS)
+    edits the header list it is given in place.
+    """
+    copy = Response(content=response.body, status_code=response.status_code)
+    copy.raw_headers = list(response.raw_headers)
+    return copy
+
+
+def iso_dates(dates: np.ndarray) -> list[str]:
+    """Format a datetime64 array as ISO dates without touching Python datetimes."""
+    return np.datetime_as_string(dates, unit="D").tolist()
+
+
+def price_series_payload(
+    frame: pd.DataFrame,
+    region: str,
+    commodity: str,
+    columnar: bool = False,
+) -> dict:
+    """Payload for one series: ``PriceSeries`` rows or ``PriceSeriesColumnar`` arrays.
+
+    The OHLC fields of a resampled series are passed through under their own
+    names; other stored columns (such as ``price_base``) are left out.
+    """
+    unit = str(frame["unit"].iloc[0]) if len(frame) else ""
+    dates = iso_dates(frame["date"].to_numpy())
+    prices = frame["price"].to_numpy(dtype=np.float64).tolist()
+    extras = {
+        name: frame[name].to_numpy().tolist()
+        for name in OHLC_COLUMNS
+        if name in frame.columns
+    }
+
+    if columnar:
+        return {
+            "region": region,
+            "commodity": commodity,
+            "unit": unit,
+            "dates": dates,
+            "prices": prices,
+            **extras,
+        }
+
+    units = frame["unit"].tolist()
+    records = [
+        {"date": d, "region": region, "commodity": commodity, "price": p, "unit": u}
+        for d, p, u in zip(dates, prices, units)
+    ]
+    for name, values in extras.items():
+        for record, value in zip(records, values):
+            record[name] = value
+    return {
+        "region": region,
+        "commodity": commodity,
+        "unit": unit,
+        "records": records,
+    }
+
+
+def negotiate_binary(request: Request) -> Optional[str]:
+    """Return the Arrow/Parquet media type the client accepts, if any."""
+    if pa is None:
+        return None
+    accept = request.headers.get("accept", "")
+    for media_type in BINARY_FORMATS:
+        if media_type in accept:
+            return media_type
+    return None
+
+
+class _ChunkSink:
+    """File-like target that hands written bytes back to a generator."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _to_table(frame: pd.DataFrame, metadata: Optional[dict[str, str]]) -> "pa.Table":
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if metadata:
+        schema_metadata = dict(table.schema.metadata or {})
+        schema_metadata.update({key.encode(): value.encode() for key, value in metadata.items()})
+        table = table.replace_schema_metadata(schema_metadata)
+    return table
+
+
+def encode_binary(
+    frames: Iterable[pd.DataFrame],
+    media_type: str,
+    empty: pd.DataFrame,
+    metadata: Optional[dict[str, str]] = None,
+    batch_rows: int = BATCH_ROWS,
+) -> Iterator[bytes]:
+    """Encode frames as one Arrow IPC stream or Parquet file, batch by batch.
+
+    The schema comes from the first frame (or ``empty`` if there is none);
+    later frames must have the same columns.
+    """
+    frames = iter(frames)
+    first = next(frames, None)
+    table = _to_table(empty if first is None else first, metadata)
+    schema = table.schema
+
+    sink = _ChunkSink()
+    target = pa.PythonFile(sink, mode="w")
+    if media_type == PARQUET:
+        writer = pq.ParquetWriter(target, schema)
+    else:
+        writer = pa.ipc.new_stream(target, schema)
+
+    while table is not None:
+        if table.schema != schema:
+            table = table.cast(schema)
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        frame = next(frames, None)
+        table = None if frame is None else _to_table(frame, metadata)
+    writer.close()
+    yield sink.drain()
+
+
+def binary_response(
+    frame: pd.DataFrame,
+    media_type: str,
+    metadata: Optional[dict[str, str]] = None,
+    batch_rows: int = BATCH_ROWS,
+) -> StreamingResponse:
+    """Stream ``frame`` as Arrow IPC stream or Parquet, batch by batch."""
+    return StreamingResponse(
+        encode_binary([frame], media_type, frame, metadata, batch_rows),
+        media_type=media_type,
+        headers={"Vary": "Accept"},
+    )
+
+
+def accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream on the fly into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -4,6 +4,8 @@ from app.api.health import router as health_router
 from app.api.metadata import router as metadata_router
 from app.api.prices import router as prices_router
 from app.api.anomalies import router as anomalies_router
+from app.api.compare import router as compare_router
+from app.api.admin import router as admin_router
 
 
 def get_api_router() -> APIRouter:
@@ -12,4 +14,6 @@ def get_api_router() -> APIRouter:
     router.include_router(metadata_router)
     router.include_router(prices_router)
     router.include_router(anomalies_router)
+    router.include_router(compare_router)
+    router.include_router(admin_router)
     return router
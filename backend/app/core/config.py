@@ -9,7 +9,22 @@ class Settings:
     app_name: str = "Food Price Anomaly Tracker"
     api_prefix: str = "/api"
     data_path: str = os.getenv("DATA_PATH", "app/data/sample_prices.csv")
+    partitions_path: str = os.getenv("PARTITIONS_PATH", "app/data/partitions")
+    fx_rates_path: str = os.getenv("FX_RATES_PATH", "app/data/fx_rates.csv")
     allow_origins: tuple[str, ...] = ("*",)
+    columnar_cache: bool = os.getenv("COLUMNAR_CACHE", "1") != "0"
+    shared_store: bool = os.getenv("SHARED_STORE", "0") == "1"
+    reload_watch_interval: float = float(os.getenv("RELOAD_WATCH_INTERVAL", "0"))
+    rolling_cache_size: int = int(os.getenv("ROLLING_CACHE_SIZE", "512"))
+    stream_window: int = int(os.getenv("STREAM_WINDOW", "12"))
+    stream_z_threshold: float = float(os.getenv("STREAM_Z_THRESHOLD", "2.0"))
+    stream_state_path: str = os.getenv("STREAM_STATE_PATH", "")
+    http_cache_max_age: int = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+    compute_threads: int = int(os.getenv("COMPUTE_THREADS", "0"))
+    compute_processes: int = int(os.getenv("COMPUTE_PROCESSES", "0"))
+    compute_max_pending: int = int(os.getenv("COMPUTE_MAX_PENDING", "64"))
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "1") != "0"
+    log_level: str = os.getenv("LOG_LEVEL", "INFO")
 
 
 def get_settings() -> Settings:
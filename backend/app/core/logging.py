@@ -1,8 +1,8 @@
 import logging
 
 
-def configure_logging() -> None:
+def configure_logging(level: str = "INFO") -> None:
     logging.basicConfig(
-        level=logging.INFO,
+        level=level.upper(),
         format="%(asctime)s %(levelname)s %(name)s - %(message)s",
     )
@@ -0,0 +1,235 @@
+"""
+Minimal Prometheus-style metrics: histograms, gauges and scrape-time collectors.
+
+Instruments are plain thread-safe objects created at import time; code
+records into them with ``observe``/``inc``/``dec`` or the ``timed`` context
+manager. Values that already live elsewhere (store size, cache counters,
+pool stats) are not mirrored: collectors registered with ``add_collector``
+read them when ``/metrics`` is scraped. ``render`` writes the Prometheus text
+exposition format (version 0.0.4), so no client library is needed.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterable, Iterator, Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latencies: 1 ms .. 10 s.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Load phases over a large CSV can take minutes.
+LOAD_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+LabelValues = tuple[str, ...]
+# (metric name, type, help, [(suffix, labels, value), ...])
+Family = tuple[str, str, str, list[tuple[str, dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class Gauge(_Metric):
+    """A value that goes up and down (in-flight requests, last durations)."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            return [("", self._labels(key), value) for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket distribution of observed values (durations in seconds)."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][position] += 1
+            series[1][0] += value
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            snapshot = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        samples = []
+        for key, counts, total in snapshot:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Observe the duration of the ``with`` block into ``histogram``, also on error."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+class Registry:
+    """Instruments plus collectors that report values owned by other modules."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Call ``collector`` at every scrape for extra metric families."""
+        self._collectors.append(collector)
+
+    def collect(self) -> Iterator[Family]:
+        for metric in list(self._metrics.values()):
+            yield metric.name, metric.type, metric.help, metric.samples()
+        for collector in list(self._collectors):
+            yield from collector()
+
+    def render(self) -> str:
+        lines = []
+        for name, kind, help, samples in self.collect():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Instruments shared across modules. Names are prefixed with ``fpt_``.
+REQUEST_PHASE = Histogram(
+    "fpt_request_phase_seconds",
+    "Time spent in each phase (filter, compute, serialize) of an API request",
+    ("endpoint", "phase"),
+)
+LOAD_PHASE = Histogram(
+    "fpt_load_phase_seconds",
+    "Duration of data load phases (CSV read, date parse, normalize, index build, ...)",
+    ("phase",),
+    LOAD_BUCKETS,
+)
+STARTUP_PHASE = Gauge(
+    "fpt_startup_phase_seconds",
+    "Duration of each data load phase during application startup",
+    ("phase",),
+)
+
+_startup = threading.local()
+
+
+@contextmanager
+def load_phase(phase: str) -> Iterator[None]:
+    """Time one data load phase; during startup it is also kept in the startup gauge."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        LOAD_PHASE.observe(elapsed, phase=phase)
+        if getattr(_startup, "active", False):
+            STARTUP_PHASE.inc(elapsed, phase=phase)
+
+
+@contextmanager
+def startup() -> Iterator[None]:
+    """Mark the current thread as loading startup data; times the whole block as ``total``."""
+    _startup.active = True
+    try:
+        with load_phase("total"):
+            yield
+    finally:
+        _startup.active = False
+
+
+def request_phase(endpoint: str, phase: str) -> ContextManager[None]:
+    """``timed`` for one phase of an API endpoint."""
+    return timed(REQUEST_PHASE, endpoint=endpoint, phase=phase)
+
+
+def sample(value: Optional[float], **labels: str) -> tuple[str, dict[str, str], float]:
+    """A collector sample without suffix; None reads as NaN."""
+    return "", labels, math.nan if value is None else float(value)
@@ -1,25 +1,46 @@
 from __future__ import annotations
 
+import logging
 import os
+import time
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 
+from app.api.conditional import ConditionalGetMiddleware
+from app.api.metrics import MetricsMiddleware, router as metrics_router
 from app.api.routes import get_api_router
 from app.core.config import get_settings
 from app.core.logging import configure_logging
-from app.services.ingestion import load_prices_from_csv
-from app.services.normalization import normalize_prices
+from app.core.metrics import startup
+from app.services.executor import ComputeSaturated, compute
+from app.services.reload import reloader
 from app.services.storage import store
+from app.services.streaming import detector
+
+logger = logging.getLogger(__name__)
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    configure_logging()
+    configure_logging(settings.log_level)
 
     application = FastAPI(title=settings.app_name)
+    # Added first so CORS wraps it and 304s still carry CORS headers.
+    application.add_middleware(
+        ConditionalGetMiddleware,
+        store=store,
+        prefix=settings.api_prefix,
+        exclude=(
+            f"{settings.api_prefix}/admin",
+            f"{settings.api_prefix}/health",
+            f"{settings.api_prefix}/anomalies/events",
+        ),
+        max_age=settings.http_cache_max_age,
+    )
     application.add_middleware(
         CORSMiddleware,
         allow_origins=list(settings.allow_origins),
@@ -27,8 +48,18 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.metrics_enabled:
+        # Outermost, so latency includes the other middleware and 304s are counted.
+        application.add_middleware(MetricsMiddleware)
 
     application.include_router(get_api_router(), prefix=settings.api_prefix)
+    if settings.metrics_enabled:
+        application.include_router(metrics_router)
+
+    @application.exception_handler(ComputeSaturated)
+    async def compute_saturated(request: Request, exc: ComputeSaturated) -> JSONResponse:
+        # Shed load instead of queueing without bound; clients retry shortly.
+        return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": "1"})
 
     # Serve built frontend
     frontend_build = Path(__file__).parent.parent.parent / "frontend" / "dist"
@@ -41,8 +72,21 @@ def create_app() -> FastAPI:
 
     @application.on_event("startup")
     def load_data() -> None:
-        df = load_prices_from_csv(settings.data_path)
-        store.prices = normalize_prices(df)
+        started = time.perf_counter()
+        with startup():
+            if settings.stream_state_path:
+                detector.load(settings.stream_state_path)
+            reloader.reload()
+        logger.info(f"Price data ready in {time.perf_counter() - started:.3f}s")
+        if settings.reload_watch_interval > 0:
+            reloader.watch(settings.reload_watch_interval)
+
+    @application.on_event("shutdown")
+    def stop_watching() -> None:
+        reloader.stop_watching()
+        compute.shutdown()
+        if settings.stream_state_path:
+            detector.save(settings.stream_state_path)
 
     return application
 
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -10,6 +12,12 @@ class PriceRecord(BaseModel):
     commodity: str
     price: float
     unit: str
+    # Only set for OHLC-resampled series, where ``price`` is the close.
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    close: Optional[float] = None
+    count: Optional[int] = None
 
 
 class PriceSeries(BaseModel):
@@ -19,10 +27,23 @@ class PriceSeries(BaseModel):
     records: list[PriceRecord]
 
 
+class PriceSeriesColumnar(BaseModel):
+    region: str
+    commodity: str
+    unit: str
+    dates: list[date]
+    prices: list[float]
+    open: Optional[list[float]] = None
+    high: Optional[list[float]] = None
+    low: Optional[list[float]] = None
+    close: Optional[list[float]] = None
+    count: Optional[list[int]] = None
+
+
 class AnomalyPoint(BaseModel):
     date: date
     price: float
-    z_score: float = Field(..., description="Standard deviation from rolling mean")
+    z_score: float = Field(..., description="Deviation from the baseline of the scoring method, in standard deviations")
 
 
 class AnomalyResponse(BaseModel):
@@ -30,9 +51,84 @@ class AnomalyResponse(BaseModel):
     commodity: str
     window: int
     threshold: float
+    method: str = "zscore"
     points: list[AnomalyPoint]
 
 
+class AnomalyScanPoint(BaseModel):
+    commodity: str
+    region: str
+    date: date
+    price: float
+    z_score: float = Field(..., description="Deviation from the baseline of the scoring method, in standard deviations")
+
+
+class AnomalyScanResponse(BaseModel):
+    window: int
+    threshold: float
+    method: str = "zscore"
+    points: list[AnomalyScanPoint]
+
+
+class AnomalyEvent(BaseModel):
+    seq: int
+    commodity: str
+    region: str
+    date: date
+    price: float
+    z_score: float
+
+
+class AnomalyEventsResponse(BaseModel):
+    window: int
+    threshold: float
+    last_seq: int = Field(..., description="Pass as `since` to get only newer events")
+    events: list[AnomalyEvent]
+
+
+class RegionStats(BaseModel):
+    region: str
+    unit: str
+    observations: int
+    mean: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    last: Optional[float] = None
+    premium: Optional[float] = Field(
+        None,
+        description="Mean relative difference from the cross-region average on the same date",
+    )
+
+
+class PriceSpread(BaseModel):
+    min: list[Optional[float]]
+    max: list[Optional[float]]
+    spread: list[Optional[float]] = Field(..., description="max - min across regions, per date")
+    relative: list[Optional[float]] = Field(..., description="spread / cross-region mean, per date")
+
+
+class CompareResponse(BaseModel):
+    commodity: str
+    unit: Optional[str] = Field(None, description="Common unit of the regions, null if they differ")
+    normalized: bool
+    regions: list[str]
+    dates: list[date]
+    matrix: list[list[Optional[float]]] = Field(
+        ...,
+        description="One row per date, one column per region; null where a region has no price",
+    )
+    correlation: list[list[Optional[float]]] = Field(
+        ...,
+        description="Pearson correlation of each pair of regions over their shared dates",
+    )
+    mean_spread: list[list[Optional[float]]] = Field(
+        ...,
+        description="Mean of (row region - column region) price over their shared dates",
+    )
+    spread: PriceSpread
+    stats: list[RegionStats]
+
+
 class SummaryCard(BaseModel):
     label: str
     value: str
@@ -42,9 +138,43 @@ class DashboardSummary(BaseModel):
     cards: list[SummaryCard]
 
 
+class CubeCell(BaseModel):
+    commodity: str
+    region: str
+    month: date = Field(..., description="First day of the month")
+    count: int
+    mean: float
+    min: float
+    max: float
+    last: float = Field(..., description="Price on the month's latest observation")
+    std: Optional[float] = Field(None, description="Sample std of the month's prices (null for one observation)")
+    yoy: Optional[float] = Field(None, description="Change of the monthly mean against the same month a year earlier")
+
+
+class SummaryCubeResponse(BaseModel):
+    cells: list[CubeCell]
+
+
 class CommodityList(BaseModel):
     items: list[str]
 
 
 class RegionList(BaseModel):
     items: list[str]
+
+
+class ReloadStatus(BaseModel):
+    running: bool
+    reloads: int
+    merges: int
+    rows: int
+    last_kind: Optional[str] = Field(None, description="full or incremental")
+    last_started: Optional[datetime] = None
+    last_finished: Optional[datetime] = None
+    last_duration_s: Optional[float] = Field(None, description="Seconds spent building the last snapshot")
+    last_error: Optional[str] = None
+
+
+class ReloadResponse(BaseModel):
+    started: bool = Field(..., description="False if a reload was already in progress")
+    status: ReloadStatus
@@ -1,7 +1,44 @@
 from __future__ import annotations
 
+from typing import Sequence
+
+import numpy as np
 import pandas as pd
 
+from app.core.config import get_settings
+from app.core.metrics import request_phase
+from app.services.cache import LRUCache
+from app.services.detectors import get_detector
+from app.services.kernels import rolling_zscore
+from app.services.singleflight import SingleFlight
+from app.services.storage import PriceIndex, SeriesKey, store
+
+# (commodity, region, window, method) -> (index the vector was computed from, scores)
+_zscore_cache = LRUCache(maxsize=get_settings().rolling_cache_size, name="zscores")
+store.add_reload_listener(_zscore_cache.clear)
+
+# Concurrent identical score/scan computations run once.
+_flight = SingleFlight("anomalies")
+
+
+_POINT_DTYPES = {
+    "commodity": "object",
+    "region": "object",
+    "date": "datetime64[ns]",
+    "price": "float64",
+    "z_score": "float64",
+}
+
+
+def empty_anomalies(columns: tuple[str, ...] = ("date", "price", "z_score")) -> pd.DataFrame:
+    """Typed, zero-row frame in the shape the detectors return."""
+    return pd.DataFrame({column: pd.Series(dtype=_POINT_DTYPES[column]) for column in columns})
+
+
+def _rolling_zscore(prices: pd.Series, window: int) -> pd.Series:
+    zscores = rolling_zscore(prices.to_numpy(dtype=np.float64), window)
+    return pd.Series(zscores, index=prices.index)
+
 
 def detect_anomalies(
     df: pd.DataFrame,
@@ -16,9 +53,142 @@ def detect_anomalies(
         return df
 
     df = df.sort_values("date").copy()
-    rolling_mean = df["price"].rolling(window=window, min_periods=max(3, window // 2)).mean()
-    rolling_std = df["price"].rolling(window=window, min_periods=max(3, window // 2)).std()
-
-    df["z_score"] = (df["price"] - rolling_mean) / rolling_std
+    df["z_score"] = _rolling_zscore(df["price"], window)
     df = df[df["z_score"].abs() >= z_threshold]
     return df
+
+
+def series_zscores(
+    index: PriceIndex,
+    commodity: str,
+    region: str,
+    window: int,
+    method: str = "zscore",
+) -> np.ndarray | None:
+    """Score vector of one indexed series, computed once per window and method.
+
+    ``method`` names a detector from detectors.py.
+    """
+    bounds = index.slices.get((commodity, region))
+    if bounds is None:
+        return None
+
+    key = (commodity, region, window, method)
+    cached = _zscore_cache.get(key)
+    if cached is not None and cached[0] is index:
+        return cached[1]
+
+    def score() -> np.ndarray:
+        detector = get_detector(method)
+        with request_phase("anomalies", "compute"):
+            zscores = detector(index.prices[bounds], np.zeros(1, dtype=np.int64), index.dates[bounds], window)
+        zscores.flags.writeable = False
+        _zscore_cache.put(key, (index, zscores))
+        return zscores
+
+    return _flight.do(("zscores", id(index), *key), score)
+
+
+def detect_series_anomalies(
+    index: PriceIndex,
+    commodity: str,
+    region: str,
+    window: int = 12,
+    z_threshold: float = 2.0,
+    method: str = "zscore",
+) -> pd.DataFrame:
+    """Cached counterpart of ``detect_anomalies`` for a series held in the store.
+
+    Returns columns: date, price, z_score (the score of ``method``).
+    """
+    zscores = series_zscores(index, commodity, region, window, method)
+    if zscores is None:
+        return empty_anomalies()
+
+    bounds = index.slices[(commodity, region)]
+    mask = np.abs(zscores) >= z_threshold
+    return pd.DataFrame(
+        {
+            "date": index.dates[bounds][mask],
+            "price": index.prices[bounds][mask],
+            "z_score": zscores[mask],
+        }
+    )
+
+
+def scan_anomalies(
+    index: PriceIndex,
+    window: int = 12,
+    z_threshold: float = 2.0,
+    commodities: Sequence[str] | None = None,
+    regions: Sequence[str] | None = None,
+    top_k: int | None = None,
+    method: str = "zscore",
+) -> pd.DataFrame:
+    """Flag anomalies across every indexed series in one vectorized pass.
+
+    Returns columns: commodity, region, date, price, z_score. Rows are in
+    series order, or ordered by descending |z_score| when ``top_k`` is set.
+    Identical concurrent scans share one result; treat it as read-only.
+    """
+    key = (
+        "scan",
+        id(index),
+        window,
+        z_threshold,
+        None if commodities is None else tuple(commodities),
+        None if regions is None else tuple(regions),
+        top_k,
+        method,
+    )
+    return _flight.do(key, lambda: _scan(index, window, z_threshold, commodities, regions, top_k, method))
+
+
+def _scan(
+    index: PriceIndex,
+    window: int,
+    z_threshold: float,
+    commodities: Sequence[str] | None,
+    regions: Sequence[str] | None,
+    top_k: int | None,
+    method: str,
+) -> pd.DataFrame:
+    columns = ("commodity", "region", "date", "price", "z_score")
+    with request_phase("anomalies.scan", "filter"):
+        keys: list[SeriesKey] = [
+            key
+            for key in index.slices
+            if (commodities is None or key[0] in commodities)
+            and (regions is None or key[1] in regions)
+        ]
+        if not keys:
+            return empty_anomalies(columns)
+
+        bounds = [index.slices[key] for key in keys]
+        if len(keys) == len(index.slices):
+            rows = slice(None)
+        else:
+            rows = np.concatenate([np.arange(b.start, b.stop) for b in bounds])
+        lengths = np.array([b.stop - b.start for b in bounds])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        prices = index.prices[rows]
+        dates = index.dates[rows]
+
+    with request_phase("anomalies.scan", "compute"):
+        zscores = get_detector(method)(prices, starts, dates, window)
+        hits = np.flatnonzero(np.abs(zscores) >= z_threshold)
+        if top_k is not None:
+            order = np.argsort(-np.abs(zscores[hits]), kind="stable")
+            hits = hits[order[:top_k]]
+
+    series_of_hit = np.searchsorted(starts, hits, side="right") - 1
+    return pd.DataFrame(
+        {
+            "commodity": [keys[i][0] for i in series_of_hit],
+            "region": [keys[i][1] for i in series_of_hit],
+            "date": dates[hits],
+            "price": prices[hits],
+            "z_score": zscores[hits],
+        },
+        columns=list(columns),
+    )
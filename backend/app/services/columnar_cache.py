@@ -0,0 +1,120 @@
+"""
+Arrow IPC cache of the parsed price CSV.
+
+The first successful CSV parse is written next to the source file with typed
+date/category columns. Later startups memory-map it instead of re-parsing, as
+long as the recorded source mtime and size (or, failing that, content hash)
+still match the CSV on disk.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = "1"
+
+
+def cache_path_for(source_path: str) -> Path:
+    source = Path(source_path)
+    return source.with_name(f"{source.name}.arrow")
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_stamp(path: str) -> dict[str, str]:
+    stat = os.stat(path)
+    return {
+        "source_mtime_ns": str(stat.st_mtime_ns),
+        "source_size": str(stat.st_size),
+    }
+
+
+def write_ipc(df: pd.DataFrame, path: Path, metadata: dict[str, str]) -> None:
+    """Atomically write ``df`` as an uncompressed Arrow IPC file."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata.update({key.encode(): value.encode() for key, value in metadata.items()})
+    table = table.replace_schema_metadata(schema_metadata)
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def read_ipc_table(path: Path) -> "pa.Table":
+    """Memory-map an Arrow IPC file; column buffers point into the mapping."""
+    source = pa.memory_map(str(path), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def ipc_metadata(table: "pa.Table") -> dict[str, str]:
+    return {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()}
+
+
+def load_cached_prices(source_path: str) -> Optional[pd.DataFrame]:
+    """Return the cached frame for ``source_path``, or None if absent or stale."""
+    if pa is None:
+        return None
+    path = cache_path_for(source_path)
+    if not path.exists():
+        return None
+
+    try:
+        table = read_ipc_table(path)
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"Ignoring unreadable columnar cache {path}: {e}")
+        return None
+
+    metadata = ipc_metadata(table)
+    if metadata.get("format_version") != CACHE_FORMAT_VERSION:
+        return None
+    stamp = source_stamp(source_path)
+    if any(metadata.get(key) != value for key, value in stamp.items()):
+        if metadata.get("source_digest") != _file_digest(source_path):
+            logger.info(f"Columnar cache {path} is stale; re-parsing {source_path}")
+            return None
+    return table.to_pandas()
+
+
+def store_cached_prices(df: pd.DataFrame, source_path: str) -> None:
+    """Write the parsed frame next to ``source_path``; failures are only logged."""
+    if pa is None:
+        logger.info("pyarrow is not installed; skipping columnar cache")
+        return
+    path = cache_path_for(source_path)
+    metadata = {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source_digest": _file_digest(source_path),
+        **source_stamp(source_path),
+    }
+    try:
+        write_ipc(df, path, metadata)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning(f"Could not write columnar cache {path}: {e}")
+        return
+    logger.info(f"Wrote columnar cache {path}")
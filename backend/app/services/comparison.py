@@ -0,0 +1,177 @@
+"""
+Side-by-side comparison of one commodity across regions.
+
+``compare_regions`` pivots the selected series of the index into a wide
+date x region matrix in one pass: each region's rows are already a
+contiguous, date-sorted slice, so the union of their dates and every
+value's row in it come from a single ``np.unique``. Correlations, pairwise
+spreads and per-date dispersion are then matrix operations on that pivot.
+Results are cached per request until the next reload.
+"""
+from __future__ import annotations
+
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.services.cache import LRUCache
+from app.services.storage import PriceIndex, store
+
+# Fewest shared dates for a correlation to be reported.
+MIN_OVERLAP = 3
+
+# (commodity, regions, start, end, normalized) -> (index, RegionComparison)
+_compare_cache = LRUCache(maxsize=get_settings().rolling_cache_size, name="compare")
+store.add_reload_listener(_compare_cache.clear)
+
+
+@dataclass(frozen=True)
+class RegionComparison:
+    commodity: str
+    regions: list[str]
+    units: list[str]
+    dates: np.ndarray
+    # dates x regions, NaN where a region has no price on that date
+    matrix: np.ndarray
+    # regions x regions; Pearson over the dates both regions have
+    correlation: np.ndarray
+    # regions x regions; mean of (row region - column region) over shared dates
+    mean_spread: np.ndarray
+
+    @property
+    def unit(self) -> Optional[str]:
+        """The regions' common unit, or None if they differ."""
+        return self.units[0] if len(set(self.units)) == 1 else None
+
+    def dispersion(self) -> dict[str, np.ndarray]:
+        """Per-date min, max, spread (max - min) and spread relative to the mean."""
+        low = _nan_reduce(np.nanmin, self.matrix, axis=1)
+        high = _nan_reduce(np.nanmax, self.matrix, axis=1)
+        mean = _nan_reduce(np.nanmean, self.matrix, axis=1)
+        spread = high - low
+        with _quiet_nan():
+            relative = np.where(mean != 0, spread / mean, np.nan)
+        return {"min": low, "max": high, "spread": spread, "relative": relative}
+
+    def region_stats(self) -> pd.DataFrame:
+        """Per-region observations, mean/min/max/last price and premium.
+
+        ``premium`` is the mean relative difference from the cross-region
+        average on the same date (0.05 = 5% above the other regions).
+        """
+        present = ~np.isnan(self.matrix)
+        row_mean = _nan_reduce(np.nanmean, self.matrix, axis=1)
+        premium = _nan_reduce(np.nanmean, self.matrix / row_mean[:, None] - 1.0, axis=0)
+        last = np.full(len(self.regions), np.nan)
+        if len(self.dates):
+            last_row = len(self.dates) - 1 - np.argmax(present[::-1], axis=0)
+            last = np.where(present.any(axis=0), self.matrix[last_row, np.arange(len(self.regions))], np.nan)
+        return pd.DataFrame(
+            {
+                "region": self.regions,
+                "unit": self.units,
+                "observations": present.sum(axis=0),
+                "mean": _nan_reduce(np.nanmean, self.matrix, axis=0),
+                "min": _nan_reduce(np.nanmin, self.matrix, axis=0),
+                "max": _nan_reduce(np.nanmax, self.matrix, axis=0),
+                "last": last,
+                "premium": premium,
+            }
+        )
+
+    def wide_frame(self) -> pd.DataFrame:
+        """The matrix as a frame with a ``date`` column and one column per region."""
+        frame = pd.DataFrame(self.matrix, columns=self.regions)
+        frame.insert(0, "date", self.dates.astype("datetime64[ns]"))
+        return frame
+
+
+@contextmanager
+def _quiet_nan() -> Iterator[None]:
+    """Silence NumPy's warnings for all-NaN rows or columns; they give NaN."""
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        yield
+
+
+def _nan_reduce(reduce, matrix: np.ndarray, axis: int) -> np.ndarray:
+    """``reduce`` (np.nanmin etc.) along ``axis``; NaN where there is nothing to reduce."""
+    if matrix.shape[axis] == 0:
+        return np.full(matrix.shape[1 - axis], np.nan)
+    with _quiet_nan():
+        return reduce(matrix, axis=axis)
+
+
+def _pairwise(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pairwise-complete correlation and mean spread of the matrix columns."""
+    present = (~np.isnan(matrix)).astype(np.float64)
+    values = np.where(present > 0, matrix, 0.0)
+    # Sums of column i over the dates column j also has, for every (i, j).
+    overlap = present.T @ present
+    sums = values.T @ present
+    with _quiet_nan():
+        mean_spread = (sums - sums.T) / overlap
+    mean_spread[overlap == 0] = np.nan
+
+    correlation = pd.DataFrame(matrix).corr(min_periods=MIN_OVERLAP).to_numpy()
+    return correlation, mean_spread
+
+
+def compare_regions(
+    index: PriceIndex,
+    commodity: str,
+    regions: Optional[Sequence[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    normalized: bool = False,
+) -> RegionComparison:
+    """Date-aligned prices of ``commodity`` in ``regions`` with their statistics.
+
+    ``regions`` defaults to every region that has the commodity; regions
+    without it are left out. ``normalized`` compares ``price_base`` (roubles
+    per base unit) instead of the published price, for regions whose units
+    differ.
+    """
+    if regions is None:
+        regions = sorted(region for c, region in index.slices if c == commodity)
+    key = (commodity, tuple(regions), start, end, normalized)
+    cached = _compare_cache.get(key)
+    if cached is not None and cached[0] is index:
+        return cached[1]
+
+    found = [region for region in dict.fromkeys(regions) if (commodity, region) in index.slices]
+    bounds = [index.slices[(commodity, region)] for region in found]
+    ranges = [index.date_range(series, start, end) for series in bounds]
+
+    column = "price_base" if normalized and "price_base" in index.frame else "price"
+    unit_column = "base_unit" if column == "price_base" else "unit"
+    values = index.prices if column == "price" else index.frame[column].to_numpy(dtype=np.float64)
+    units = [str(index.frame[unit_column].iloc[series.stop - 1]) for series in bounds]
+
+    if ranges:
+        rows = np.concatenate([np.arange(r.start, r.stop) for r in ranges])
+        columns = np.repeat(np.arange(len(ranges)), [r.stop - r.start for r in ranges])
+    else:
+        rows = columns = np.empty(0, dtype=np.int64)
+    dates, positions = np.unique(index.dates[rows].astype("datetime64[D]"), return_inverse=True)
+    matrix = np.full((len(dates), len(found)), np.nan)
+    matrix[positions, columns] = values[rows]
+
+    correlation, mean_spread = _pairwise(matrix)
+    result = RegionComparison(
+        commodity=commodity,
+        regions=found,
+        units=units,
+        dates=dates,
+        matrix=matrix,
+        correlation=correlation,
+        mean_spread=mean_spread,
+    )
+    _compare_cache.put(key, (index, result))
+    return result
@@ -0,0 +1,211 @@
+"""
+Materialized (commodity, region, month) aggregate cube.
+
+The index keeps every series as a date-sorted block, so its (series, month)
+groups are contiguous runs of rows and one ``reduceat`` pass per statistic
+aggregates the whole table into cells: count, mean, min, max, last price
+and the sum of squared deviations (for the sample std). Cells are kept
+sorted by (commodity, region, month) with per-series row ranges, so serving
+a slice is a dict lookup plus a binary search, never a scan of raw rows.
+
+After an incremental merge only the appended rows are aggregated, and their
+cells are combined with the existing ones (Chan's parallel mean/variance
+update), instead of re-aggregating the full table.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.storage import PriceIndex, SeriesKey, store
+
+logger = logging.getLogger(__name__)
+
+CELL_COLUMNS = ["commodity", "region", "month", "count", "mean", "min", "max", "last", "std", "yoy"]
+_KEY_COLUMNS = ["commodity", "region", "month"]
+
+
+def _run_starts(*keys: np.ndarray) -> np.ndarray:
+    """Offsets where any of the (equal-length, grouped) key arrays changes."""
+    n = len(keys[0])
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    changed = np.zeros(n - 1, dtype=bool)
+    for key in keys:
+        changed |= key[1:] != key[:-1]
+    return np.concatenate(([0], np.flatnonzero(changed) + 1))
+
+
+def _aggregate_rows(index: PriceIndex) -> pd.DataFrame:
+    """One raw cell per (series, month) of ``index``, in index order."""
+    keys = list(index.slices)
+    lengths = [bounds.stop - bounds.start for bounds in index.slices.values()]
+    series = np.repeat(np.arange(len(keys)), lengths)
+    months = index.dates.astype("datetime64[M]")
+    prices = index.prices
+
+    starts = _run_starts(series, months)
+    counts = np.diff(np.append(starts, len(prices)))
+    if len(starts):
+        mean = np.add.reduceat(prices, starts) / counts
+        group = np.repeat(np.arange(len(starts)), counts)
+        m2 = np.add.reduceat((prices - mean[group]) ** 2, starts)
+        low = np.minimum.reduceat(prices, starts)
+        high = np.maximum.reduceat(prices, starts)
+    else:
+        mean = m2 = low = high = np.empty(0)
+    ends = starts + counts - 1
+
+    cell_series = series[starts]
+    return pd.DataFrame(
+        {
+            "commodity": np.array([key[0] for key in keys], dtype=object)[cell_series],
+            "region": np.array([key[1] for key in keys], dtype=object)[cell_series],
+            "month": months[starts],
+            "count": counts,
+            "mean": mean,
+            "m2": m2,
+            "min": low,
+            "max": high,
+            "last": prices[ends],
+            "last_date": index.dates[ends],
+        }
+    )
+
+
+def _combine(cells: pd.DataFrame) -> pd.DataFrame:
+    """Merge raw cells sharing a (commodity, region, month) key into one each."""
+    cells = cells.sort_values([*_KEY_COLUMNS, "last_date"], kind="stable", ignore_index=True)
+    starts = _run_starts(*(cells[column].to_numpy() for column in _KEY_COLUMNS))
+    if len(starts) == len(cells):
+        return cells
+
+    counts = cells["count"].to_numpy()
+    means = cells["mean"].to_numpy()
+    total = np.add.reduceat(counts, starts)
+    mean = np.add.reduceat(counts * means, starts) / total
+    group = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(cells))))
+    m2 = np.add.reduceat(cells["m2"].to_numpy() + counts * (means - mean[group]) ** 2, starts)
+    ends = np.append(starts[1:], len(cells)) - 1
+
+    merged = cells.iloc[ends].reset_index(drop=True)
+    merged["count"] = total
+    merged["mean"] = mean
+    merged["m2"] = m2
+    merged["min"] = np.minimum.reduceat(cells["min"].to_numpy(), starts)
+    merged["max"] = np.maximum.reduceat(cells["max"].to_numpy(), starts)
+    return merged
+
+
+@dataclass(frozen=True)
+class SummaryCube:
+    """Aggregate cells sorted by (commodity, region, month), with per-series ranges."""
+
+    cells: pd.DataFrame
+    months: np.ndarray
+    slices: dict[SeriesKey, slice] = field(default_factory=dict)
+
+    @classmethod
+    def from_cells(cls, cells: pd.DataFrame) -> "SummaryCube":
+        cells = cells.sort_values(_KEY_COLUMNS, kind="stable", ignore_index=True)
+        counts = cells["count"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cells["std"] = np.where(counts > 1, np.sqrt(cells["m2"].to_numpy() / (counts - 1)), np.nan)
+
+        commodities = cells["commodity"].to_numpy()
+        regions = cells["region"].to_numpy()
+        months = cells["month"].to_numpy().astype("datetime64[M]")
+        starts = _run_starts(commodities, regions)
+        stops = np.append(starts[1:], len(cells))
+        slices = {
+            (commodities[start], regions[start]): slice(start, stop)
+            for start, stop in zip(starts.tolist(), stops.tolist())
+        }
+
+        # Year-over-year change of the monthly mean, where the series has
+        # a cell twelve months earlier.
+        series = np.repeat(np.arange(len(starts)), stops - starts)
+        key = series * 1_000_000 + months.astype(np.int64)
+        previous = np.searchsorted(key, key - 12).clip(max=max(len(key) - 1, 0))
+        found = key[previous] == key - 12 if len(key) else np.empty(0, dtype=bool)
+        mean = cells["mean"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cells["yoy"] = np.where(found, mean / mean[previous] - 1.0, np.nan)
+        return cls(cells=cells, months=months, slices=slices)
+
+    @classmethod
+    def build(cls, index: Optional[PriceIndex]) -> "SummaryCube":
+        """Aggregate the whole index in one pass."""
+        return cls.from_cells(_aggregate_rows(index or PriceIndex.build(_EMPTY_PRICES)))
+
+    def merge(self, appended: pd.DataFrame) -> "SummaryCube":
+        """Cube of the current data plus ``appended`` price rows.
+
+        Only the cells of series that received rows are recombined.
+        """
+        delta = _aggregate_rows(PriceIndex.build(appended))
+        touched = np.zeros(len(self.cells), dtype=bool)
+        for key in set(zip(delta["commodity"], delta["region"])):
+            bounds = self.slices.get(key)
+            if bounds is not None:
+                touched[bounds] = True
+        base = self.cells.drop(columns=["std", "yoy"])
+        updated = _combine(pd.concat([base[touched], delta], ignore_index=True))
+        return SummaryCube.from_cells(pd.concat([base[~touched], updated], ignore_index=True))
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def slice(
+        self,
+        commodity: str,
+        region: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> slice:
+        """Cell rows of one series with ``start <= month <= end`` (empty if unknown)."""
+        bounds = self.slices.get((commodity, region))
+        if bounds is None:
+            return slice(0, 0)
+        months = self.months[bounds]
+        lo = 0 if start is None else int(np.searchsorted(months, np.datetime64(start, "M"), side="left"))
+        hi = len(months) if end is None else int(np.searchsorted(months, np.datetime64(end, "M"), side="right"))
+        return slice(bounds.start + lo, bounds.start + max(lo, hi))
+
+
+_EMPTY_PRICES = pd.DataFrame(
+    {
+        "date": pd.Series(dtype="datetime64[ns]"),
+        "region": pd.Series(dtype="object"),
+        "commodity": pd.Series(dtype="object"),
+        "price": pd.Series(dtype="float64"),
+    }
+)
+
+
+class CubeHolder:
+    """Keeps the cube in step with the store: full rebuilds or incremental merges."""
+
+    def __init__(self) -> None:
+        self.cube = SummaryCube.build(None)
+        self.version = 0
+
+    def refresh(self) -> None:
+        started = time.perf_counter()
+        appended = store.appended
+        if appended is not None and self.version == store.version - 1:
+            self.cube, kind = self.cube.merge(appended), f"merged {len(appended)} rows into"
+        else:
+            self.cube, kind = SummaryCube.build(store.index), "built"
+        self.version = store.version
+        logger.info(f"Summary cube {kind} {len(self.cube)} cells in {time.perf_counter() - started:.3f}s")
+
+
+summary_cube = CubeHolder()
+store.add_reload_listener(summary_cube.refresh)
@@ -0,0 +1,170 @@
+"""
+Pluggable anomaly scoring kernels.
+
+Every detector has the same shape: it takes the prices of one or more series
+laid end to end (``values``), the offset of each series (``starts``), their
+dates and a window length, and returns one z-like score per point (NaN where
+there is not enough history). Windows never cross a series boundary, so the
+same call scores a single series or the whole table at once.
+
+Detectors are looked up by name with ``get_detector``; ``register_detector``
+adds new ones.
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.services.kernels import default_min_periods, segmented_rolling_zscore
+
+Detector = Callable[[np.ndarray, np.ndarray, np.ndarray, int], np.ndarray]
+
+# Scales a median absolute deviation to a standard deviation for normal data.
+MAD_SCALE = 1.4826
+# Rows scored per block by the rolling-MAD detector, bounding its scratch memory.
+_MAD_BLOCK_ROWS = 65_536
+
+_DETECTORS: dict[str, Detector] = {}
+
+
+def register_detector(name: str) -> Callable[[Detector], Detector]:
+    def register(detector: Detector) -> Detector:
+        _DETECTORS[name] = detector
+        return detector
+
+    return register
+
+
+def get_detector(name: str) -> Detector:
+    try:
+        return _DETECTORS[name]
+    except KeyError:
+        raise KeyError(f"Unknown anomaly method {name!r}; expected one of {', '.join(detector_names())}") from None
+
+
+def detector_names() -> list[str]:
+    return list(_DETECTORS)
+
+
+def _series_ids(n: int, starts: np.ndarray) -> np.ndarray:
+    lengths = np.diff(np.append(starts, n))
+    return np.repeat(np.arange(len(starts)), lengths)
+
+
+@register_detector("zscore")
+def rolling_zscores(values: np.ndarray, starts: np.ndarray, dates: np.ndarray | None = None, window: int = 12) -> np.ndarray:
+    """Rolling mean/std z-scores with the window rules of ``detect_anomalies``."""
+    return segmented_rolling_zscore(values, starts, window, default_min_periods(window))
+
+
+@register_detector("mad")
+def rolling_mad_scores(values: np.ndarray, starts: np.ndarray, dates: np.ndarray | None = None, window: int = 12) -> np.ndarray:
+    """Robust z-scores against the rolling median and median absolute deviation.
+
+    One outlier cannot inflate the spread it is measured against, unlike the
+    mean/std z-score. Each series is front-padded with ``window - 1`` NaNs so
+    a strided view gives every point its trailing window without crossing
+    into the previous series.
+    """
+    n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+
+    pad = window - 1
+    series = _series_ids(n, starts)
+    padded_pos = np.arange(n) + pad * (series + 1)
+    padded = np.full(n + pad * len(starts), np.nan)
+    padded[padded_pos] = values
+    windows = sliding_window_view(padded, window)
+
+    scores = np.full(n, np.nan)
+    min_periods = default_min_periods(window)
+    for lo in range(0, n, _MAD_BLOCK_ROWS):
+        block = windows[padded_pos[lo:lo + _MAD_BLOCK_ROWS] - pad]
+        count = np.count_nonzero(~np.isnan(block), axis=1)
+        ready = count >= min_periods
+        if not ready.any():
+            continue
+        block = block[ready]
+        median = np.nanmedian(block, axis=1)
+        mad = np.nanmedian(np.abs(block - median[:, None]), axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            robust = (values[lo:lo + _MAD_BLOCK_ROWS][ready] - median) / (MAD_SCALE * mad)
+        robust[mad == 0.0] = np.nan
+        scores[lo:lo + _MAD_BLOCK_ROWS][ready] = robust
+    return scores
+
+
+@register_detector("ewma")
+def ewma_zscores(values: np.ndarray, starts: np.ndarray, dates: np.ndarray | None = None, window: int = 12) -> np.ndarray:
+    """z-scores against the exponentially weighted mean/std of earlier points.
+
+    ``window`` is the EWMA span. The baseline excludes the point being
+    scored, so a jump is measured against the level it departs from and
+    recent points weigh more than the start of a long window.
+    """
+    n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+
+    series = _series_ids(n, starts)
+    ewm = pd.Series(values).groupby(series).ewm(span=window, min_periods=default_min_periods(window))
+    mean = ewm.mean().to_numpy()
+    std = ewm.std().to_numpy()
+
+    # Shift the baseline by one point within each series.
+    baseline_mean = np.concatenate(([np.nan], mean[:-1]))
+    baseline_std = np.concatenate(([np.nan], std[:-1]))
+    baseline_mean[starts] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = (values - baseline_mean) / baseline_std
+    scores[~(baseline_std > 0)] = np.nan
+    return scores
+
+
+@register_detector("seasonal")
+def seasonal_residual_scores(values: np.ndarray, starts: np.ndarray, dates: np.ndarray, window: int = 12) -> np.ndarray:
+    """Robust z-scores of residuals left after removing trend and seasonality.
+
+    The series is decomposed in log space: the trend is a centred rolling
+    median over ``window`` points and the seasonal component the mean
+    detrended value of the same calendar month in the series' other years
+    (leave-one-out, so an anomaly does not explain itself away). Residuals are scaled by their per-series MAD, so regular
+    yearly swings such as summer vegetable prices are not flagged.
+    """
+    n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+
+    # Prices grow and swing multiplicatively, so decompose their logarithm.
+    logs = np.log(np.where(values > 0, values, np.nan))
+    series = _series_ids(n, starts)
+    grouped = pd.Series(logs).groupby(series)
+    # Near the ends a centred window would cover only part of a season, so
+    # carry the nearest full-window trend outwards instead.
+    full = grouped.rolling(window, center=True, min_periods=window).median().reset_index(drop=True)
+    trend = full.groupby(series).ffill().groupby(series).bfill().to_numpy()
+    partial = grouped.rolling(window, center=True, min_periods=default_min_periods(window)).median().to_numpy()
+    trend = np.where(np.isnan(trend), partial, trend)
+    detrended = logs - trend
+
+    month = dates.astype("datetime64[M]").astype(np.int64) % 12
+    key = series * 12 + month
+    valid = ~np.isnan(detrended)
+    sums = np.bincount(key[valid], weights=detrended[valid], minlength=len(starts) * 12)
+    counts = np.bincount(key[valid], minlength=len(starts) * 12)
+    others = counts[key] - valid
+    with np.errstate(divide="ignore", invalid="ignore"):
+        seasonal = np.where(others > 0, (sums[key] - np.where(valid, detrended, 0.0)) / others, 0.0)
+    residual = detrended - seasonal
+
+    residuals = pd.Series(residual).groupby(series)
+    center = residuals.transform("median").to_numpy()
+    mad = pd.Series(np.abs(residual - center)).groupby(series).transform("median").to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = (residual - center) / (MAD_SCALE * mad)
+    scores[~(mad > 0)] = np.nan
+    return scores
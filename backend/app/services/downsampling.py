@@ -0,0 +1,178 @@
+"""
+Server-side reduction of long price series for charting.
+
+``resample`` aggregates a date-sorted series into calendar weeks or months
+(mean or OHLC) and ``lttb`` picks a visually representative subset of points
+(Largest-Triangle-Three-Buckets). Both work on the column arrays of the
+series index; ``downsample_series`` combines them and caches the result per
+series row range and options until the next reload.
+"""
+from __future__ import annotations
+
+from typing import Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.services.cache import LRUCache
+from app.services.executor import compute
+from app.services.singleflight import SingleFlight
+from app.services.storage import PriceIndex, store
+
+Resolution = Literal["week", "month"]
+Aggregate = Literal["mean", "ohlc"]
+
+OHLC_COLUMNS = ["open", "high", "low", "close", "count"]
+
+# (rows.start, rows.stop, resolution, aggregate, max_points) -> (index, frame)
+_downsample_cache = LRUCache(maxsize=get_settings().rolling_cache_size, name="downsample")
+store.add_reload_listener(_downsample_cache.clear)
+
+# Concurrent identical downsampling requests run once.
+_flight = SingleFlight("prices")
+
+
+def _period_starts(dates: np.ndarray, resolution: Resolution) -> np.ndarray:
+    days = dates.astype("datetime64[D]")
+    if resolution == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    # 1970-01-01 was a Thursday; shift so weeks start on Monday.
+    weekday = (days.astype(np.int64) + 3) % 7
+    return days - weekday.astype("timedelta64[D]")
+
+
+def resample(
+    dates: np.ndarray,
+    prices: np.ndarray,
+    resolution: Resolution,
+    aggregate: Aggregate = "mean",
+) -> dict[str, np.ndarray]:
+    """Aggregate date-sorted prices into one row per calendar period.
+
+    Returns column arrays keyed ``date`` (period start) and ``price`` (mean,
+    or the close for OHLC), plus ``open``/``high``/``low``/``close``/``count``
+    when ``aggregate`` is "ohlc".
+    """
+    if len(dates) == 0:
+        columns = {"date": dates.astype("datetime64[D]"), "price": prices}
+        if aggregate == "ohlc":
+            columns.update({name: prices for name in OHLC_COLUMNS[:-1]})
+            columns["count"] = np.empty(0, dtype=np.int64)
+        return columns
+
+    periods = _period_starts(dates, resolution)
+    starts = np.concatenate(([0], np.flatnonzero(periods[1:] != periods[:-1]) + 1))
+    counts = np.diff(np.append(starts, len(prices)))
+
+    if aggregate == "mean":
+        return {
+            "date": periods[starts],
+            "price": np.add.reduceat(prices, starts) / counts,
+        }
+
+    close = prices[starts + counts - 1]
+    return {
+        "date": periods[starts],
+        "price": close,
+        "open": prices[starts],
+        "high": np.maximum.reduceat(prices, starts),
+        "low": np.minimum.reduceat(prices, starts),
+        "close": close,
+        "count": counts,
+    }
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Each bucket in between keeps
+    the point forming the largest triangle with the previously kept point
+    and the mean of the next bucket; the area search is vectorized per bucket.
+    """
+    n = len(x)
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points")
+    if threshold >= n:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_lo, next_hi = hi, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_lo:next_hi].mean()
+        next_y = y[next_lo:next_hi].mean()
+
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - next_x) * (y[lo:hi] - py) - (px - x[lo:hi]) * (next_y - py))
+        previous = lo + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_series(
+    index: PriceIndex,
+    rows: slice,
+    resolution: Optional[Resolution] = None,
+    aggregate: Aggregate = "mean",
+    max_points: Optional[int] = None,
+) -> pd.DataFrame:
+    """Resampled and/or LTTB-reduced copy of one series' rows of ``index``.
+
+    ``rows`` must lie within a single series. The frame keeps the price
+    columns of the index (plus OHLC columns when requested) so it can be
+    serialized like a raw slice.
+    """
+    key = (rows.start, rows.stop, resolution, aggregate, max_points)
+    cached = _downsample_cache.get(key)
+    if cached is not None and cached[0] is index:
+        return cached[1]
+
+    def build() -> pd.DataFrame:
+        frame = _downsample(index, rows, resolution, aggregate, max_points)
+        _downsample_cache.put(key, (index, frame))
+        return frame
+
+    return _flight.do((id(index), *key), build)
+
+
+def _downsample(
+    index: PriceIndex,
+    rows: slice,
+    resolution: Optional[Resolution],
+    aggregate: Aggregate,
+    max_points: Optional[int],
+) -> pd.DataFrame:
+    raw = index.frame.iloc[rows]
+    if resolution is not None:
+        columns = resample(index.dates[rows], index.prices[rows], resolution, aggregate)
+    else:
+        columns = {"date": index.dates[rows], "price": index.prices[rows]}
+
+    if max_points is not None and len(columns["date"]) > max_points:
+        # LTTB's bucket loop is Python-level; it goes to the process pool if one is configured.
+        keep = compute.call(lttb, columns["date"].astype("datetime64[s]").astype(np.int64), columns["price"], max_points)
+        columns = {name: values[keep] for name, values in columns.items()}
+
+    size = len(columns["date"])
+    labels = {
+        name: [str(raw[name].iloc[-1])] * size if len(raw) else []
+        for name in ("region", "commodity", "unit")
+    }
+    return pd.DataFrame(
+        {
+            "date": columns.pop("date").astype("datetime64[ns]"),
+            "region": labels["region"],
+            "commodity": labels["commodity"],
+            "price": columns.pop("price"),
+            "unit": labels["unit"],
+            **columns,
+        }
+    )
@@ -0,0 +1,186 @@
+"""
+Dedicated executors for CPU-heavy request work.
+
+FastAPI runs sync handlers on AnyIO's shared thread pool (40 tokens), so a
+burst of anomaly scans could starve trivial endpoints such as /health. The
+cheap handlers are ``async`` and never leave the event loop; the heavy ones
+hand their work to ``compute`` instead:
+
+- a thread pool (``COMPUTE_THREADS``) for NumPy/pandas code, whose kernels
+  release the GIL;
+- a process pool (``COMPUTE_PROCESSES``, off by default) for pure-Python
+  loops, fed only small picklable arguments.
+
+At most ``COMPUTE_MAX_PENDING`` tasks may be queued or running per pool.
+Beyond that ``run`` raises ``ComputeSaturated`` at once (the API answers 503
+with Retry-After) rather than letting queues and latency grow without bound.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any, Callable, Literal, Optional, TypeVar
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+PoolKind = Literal["thread", "process"]
+
+
+class ComputeSaturated(RuntimeError):
+    """Raised when a pool already has its maximum number of pending tasks."""
+
+
+@dataclass
+class PoolStats:
+    workers: int
+    max_pending: int
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    # Tasks accepted and not finished yet (queued + running).
+    pending: int = 0
+    running: int = 0
+    peak_pending: int = 0
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - self.running)
+
+
+class _Pool:
+    """An executor plus admission control and counters."""
+
+    def __init__(self, name: str, executor: Executor, workers: int, max_pending: int) -> None:
+        self.name = name
+        self.executor = executor
+        self.stats = PoolStats(workers=workers, max_pending=max_pending)
+        self._lock = threading.Lock()
+        self._tracks_running = isinstance(executor, ThreadPoolExecutor)
+
+    def _started(self) -> None:
+        with self._lock:
+            self.stats.running += 1
+
+    def _run_tracked(self, fn: Callable[..., T]) -> T:
+        self._started()
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self.stats.running -= 1
+
+    def _finished(self, future: Future) -> None:
+        with self._lock:
+            self.stats.pending -= 1
+            if not self._tracks_running:
+                self.stats.running = min(self.stats.pending, self.stats.workers)
+            if future.cancelled() or future.exception() is not None:
+                self.stats.failed += 1
+            else:
+                self.stats.completed += 1
+
+    def try_submit(self, fn: Callable[..., T]) -> Optional[Future]:
+        """Submit ``fn`` (no arguments), or return None if the pool is full."""
+        with self._lock:
+            stats = self.stats
+            if stats.pending >= stats.max_pending:
+                stats.rejected += 1
+                return None
+            stats.submitted += 1
+            stats.pending += 1
+            stats.peak_pending = max(stats.peak_pending, stats.pending)
+            if not self._tracks_running:
+                stats.running = min(stats.pending, stats.workers)
+        try:
+            if self._tracks_running:
+                future = self.executor.submit(self._run_tracked, fn)
+            else:
+                future = self.executor.submit(fn)
+        except BaseException:
+            with self._lock:
+                self.stats.pending -= 1
+                self.stats.failed += 1
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+
+class ComputeExecutor:
+    """Thread pool (and optional process pool) for heavy request work."""
+
+    def __init__(self, threads: int = 0, processes: int = 0, max_pending: int = 64) -> None:
+        self.threads = threads or os.cpu_count() or 4
+        self.processes = processes
+        self.max_pending = max_pending
+        self._pools: dict[str, _Pool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, kind: PoolKind) -> Optional[_Pool]:
+        pool = self._pools.get(kind)
+        if pool is not None or (kind == "process" and self.processes <= 0):
+            return pool
+        with self._lock:
+            pool = self._pools.get(kind)
+            if pool is None:
+                if kind == "thread":
+                    executor: Executor = ThreadPoolExecutor(self.threads, thread_name_prefix="compute")
+                    workers = self.threads
+                else:
+                    # Spawned, not forked: the server process runs threads.
+                    context = multiprocessing.get_context("spawn")
+                    executor = ProcessPoolExecutor(self.processes, mp_context=context)
+                    workers = self.processes
+                pool = self._pools[kind] = _Pool(kind, executor, workers, self.max_pending)
+                logger.info(f"Started compute {kind} pool with {workers} workers")
+        return pool
+
+    async def run(self, fn: Callable[..., T], *args: Any, kind: PoolKind = "thread", **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on a pool and await its result.
+
+        ``kind="process"`` falls back to the thread pool when no process pool
+        is configured. Raises ``ComputeSaturated`` if the pool is full.
+        """
+        pool = self._pool(kind) or self._pool("thread")
+        future = pool.try_submit(partial(fn, *args, **kwargs))
+        if future is None:
+            raise ComputeSaturated(f"Compute {pool.name} pool has {pool.stats.max_pending} pending tasks")
+        return await asyncio.wrap_future(future)
+
+    def call(self, fn: Callable[..., T], *args: Any, kind: PoolKind = "process", **kwargs: Any) -> T:
+        """Blocking variant for code already running on a worker.
+
+        Runs inline when the pool is not configured or full, since the caller
+        has already been admitted.
+        """
+        pool = self._pool(kind)
+        future = None if pool is None else pool.try_submit(partial(fn, *args, **kwargs))
+        if future is None:
+            return fn(*args, **kwargs)
+        return future.result()
+
+    def stats(self) -> dict[str, dict]:
+        """Per-pool counters, including current queue depth."""
+        return {
+            kind: {**asdict(pool.stats), "queued": pool.stats.queued}
+            for kind, pool in list(self._pools.items())
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_settings = get_settings()
+compute = ComputeExecutor(_settings.compute_threads, _settings.compute_processes, _settings.compute_max_pending)
@@ -0,0 +1,82 @@
+"""
+Chunked iteration over the indexed price table for bulk export.
+
+Series are selected through the index and trimmed to the date range with a
+binary search on their (date-sorted) rows, then emitted as frames of at most
+``chunk_rows`` rows, so memory use stays flat whatever the table size.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.storage import PriceIndex
+
+EXPORT_COLUMNS = ["date", "region", "commodity", "price", "unit"]
+CHUNK_ROWS = 10_000
+
+
+def _row_ranges(
+    index: PriceIndex,
+    commodities: Optional[Iterable[str]],
+    regions: Optional[Iterable[str]],
+    start: Optional[date],
+    end: Optional[date],
+) -> Iterator[tuple[int, int]]:
+    commodities = None if commodities is None else set(commodities)
+    regions = None if regions is None else set(regions)
+
+    for (commodity, region), bounds in index.slices.items():
+        if commodities is not None and commodity not in commodities:
+            continue
+        if regions is not None and region not in regions:
+            continue
+        rows = index.date_range(bounds, start, end)
+        if rows.start < rows.stop:
+            yield rows.start, rows.stop
+
+
+def iter_price_chunks(
+    index: PriceIndex,
+    commodities: Optional[Iterable[str]] = None,
+    regions: Optional[Iterable[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Yield the selected rows in index order, ``chunk_rows`` at a time."""
+    frame = index.frame
+    pending: list[np.ndarray] = []
+    pending_rows = 0
+    for lo, hi in _row_ranges(index, commodities, regions, start, end):
+        while lo < hi:
+            take = min(hi - lo, chunk_rows - pending_rows)
+            pending.append(np.arange(lo, lo + take))
+            pending_rows += take
+            lo += take
+            if pending_rows == chunk_rows:
+                yield frame.iloc[np.concatenate(pending)][EXPORT_COLUMNS]
+                pending, pending_rows = [], 0
+    if pending:
+        yield frame.iloc[np.concatenate(pending)][EXPORT_COLUMNS]
+
+
+def _iso_dates(chunk: pd.DataFrame) -> pd.DataFrame:
+    return chunk.assign(date=np.datetime_as_string(chunk["date"].to_numpy(), unit="D"))
+
+
+def encode_csv(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    header = True
+    for chunk in chunks:
+        yield _iso_dates(chunk).to_csv(index=False, header=header).encode("utf-8")
+        header = False
+    if header:
+        yield (",".join(EXPORT_COLUMNS) + "\n").encode("utf-8")
+
+
+def encode_ndjson(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield _iso_dates(chunk).to_json(orient="records", lines=True, force_ascii=False).encode("utf-8")
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import logging
+import time
+
 import pandas as pd
+from app.core.config import get_settings
+from app.core.metrics import load_phase
+from app.services.columnar_cache import load_cached_prices, store_cached_prices
+from app.services.partitions import KEY_COLUMNS
 from app.services.rosstat_ingestion import fetch_with_fallback
 
+logger = logging.getLogger(__name__)
+
+CATEGORY_COLUMNS = ("region", "commodity", "unit")
+
 
 def load_prices_from_csv(path: str) -> pd.DataFrame:
     """
@@ -13,7 +24,47 @@ def load_prices_from_csv(path: str) -> pd.DataFrame:
     - 5 cities (Moscow, St Petersburg, Novosibirsk, Yekaterinburg, Kazan)
     
     See rosstat_ingestion.py for data fetching and filtering logic.
+    When the columnar cache is enabled, a fresh Arrow copy next to the CSV
+    is memory-mapped instead (see columnar_cache.py).
     """
+    use_cache = get_settings().columnar_cache
+    started = time.perf_counter()
+
+    if use_cache:
+        with load_phase("columnar_cache_read"):
+            df = load_cached_prices(path)
+        if df is not None:
+            logger.info(f"Loaded {len(df)} rows from columnar cache in {time.perf_counter() - started:.3f}s")
+            return df
+
     df = fetch_with_fallback(path)
-    df["price"] = df["price"].astype(float)
+    with load_phase("categorize"):
+        df["price"] = df["price"].astype(float)
+        for column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype("category")
+    logger.info(f"Parsed {len(df)} rows from CSV in {time.perf_counter() - started:.3f}s")
+
+    if use_cache:
+        with load_phase("columnar_cache_write"):
+            store_cached_prices(df, path)
     return df
+
+
+def merge_prices(current: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Add ``new`` observations to ``current``; keys already present keep their value.
+
+    Rows taken from ``new`` come last, labelled from ``len(current)`` up (see
+    ``added_rows``).
+    """
+    with load_phase("merge"):
+        combined = pd.concat([current, new], ignore_index=True)
+        combined = combined.drop_duplicates(subset=KEY_COLUMNS, keep="first")
+        for column in (*CATEGORY_COLUMNS, "base_unit"):
+            if column in combined:
+                combined[column] = combined[column].astype("category")
+    return combined
+
+
+def added_rows(current: pd.DataFrame, merged: pd.DataFrame) -> pd.DataFrame:
+    """The rows ``merge_prices(current, ...)`` actually added to ``current``."""
+    return merged.iloc[int(merged.index.searchsorted(len(current))):]
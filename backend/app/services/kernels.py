@@ -0,0 +1,176 @@
+"""
+Single-pass rolling z-score kernel.
+
+Rolling mean, sample std (ddof=1) and z-score are computed together in one
+pass over a contiguous float64 array, with the window and ``min_periods``
+rules of pandas ``rolling()``. Several series can be scored in one call,
+either as the rows of a 2-D array or laid end to end with their start
+offsets; windows never cross from one series into the next.
+
+With Numba installed the loop is compiled: running sums anchored on a value
+inside the window, re-summed exactly once per ``window`` steps so rounding
+cannot build up. Without it, a vectorized NumPy fallback uses differences of
+cumulative sums, restarted every block so their magnitude stays bounded.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional: the NumPy fallback is used instead
+    numba = None
+
+# Rows per block of the NumPy fallback's cumulative sums.
+_BLOCK_ROWS = 8_192
+
+
+def default_min_periods(window: int) -> int:
+    return max(3, window // 2)
+
+
+def _zscore_segments_py(
+    values: np.ndarray,
+    starts: np.ndarray,
+    window: int,
+    min_periods: int,
+    out: np.ndarray,
+) -> None:
+    n = values.shape[0]
+    for s in range(starts.shape[0]):
+        lo = starts[s]
+        hi = starts[s + 1] if s + 1 < starts.shape[0] else n
+        anchor = 0.0
+        total = 0.0
+        total_sq = 0.0
+        for i in range(lo, hi):
+            first = max(lo, i - window + 1)
+            if (i - lo) % window == 0:
+                # Re-anchor on the newest value and re-sum the window exactly.
+                anchor = values[i]
+                total = 0.0
+                total_sq = 0.0
+                for j in range(first, i + 1):
+                    d = values[j] - anchor
+                    total += d
+                    total_sq += d * d
+            else:
+                d = values[i] - anchor
+                total += d
+                total_sq += d * d
+                if i - window >= lo:
+                    d = values[i - window] - anchor
+                    total -= d
+                    total_sq -= d * d
+
+            count = i - first + 1
+            if count < min_periods or count < 2:
+                out[i] = np.nan
+                continue
+            mean = total / count
+            var = (total_sq - total * mean) / (count - 1)
+            # A flat window has zero spread, but the running sums can leave a
+            # rounding residue; anything below ~1e-7 of the price level is that.
+            if var <= 1e-14 * (anchor * anchor + total_sq / count):
+                out[i] = np.nan
+            else:
+                out[i] = (values[i] - anchor - mean) / np.sqrt(var)
+
+
+_zscore_segments_jit = None if numba is None else numba.njit(cache=True, nogil=True)(_zscore_segments_py)
+
+
+def _zscore_segments_numpy(
+    values: np.ndarray,
+    starts: np.ndarray,
+    window: int,
+    min_periods: int,
+    out: np.ndarray,
+) -> None:
+    n = values.shape[0]
+    lengths = np.diff(np.append(starts, n))
+    series_start = np.repeat(starts, lengths)
+
+    for lo in range(0, n, _BLOCK_ROWS):
+        hi = min(lo + _BLOCK_ROWS, n)
+        ext = max(0, lo - window + 1)
+        # Cumulative sums restart every block, over values taken relative to
+        # their series' first value in the block, so they stay small.
+        anchor_at = np.maximum(series_start[ext:hi], ext)
+        centered = values[ext:hi] - values[anchor_at]
+        csum = np.concatenate(([0.0], np.cumsum(centered)))
+        csum_sq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+        pos = np.arange(lo, hi)
+        first = np.maximum(pos - window + 1, series_start[lo:hi])
+        count = pos - first + 1
+        total = csum[pos + 1 - ext] - csum[first - ext]
+        total_sq = csum_sq[pos + 1 - ext] - csum_sq[first - ext]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / count
+            var = (total_sq - total * mean) / (count - 1)
+            # A flat window has zero spread; treat cancellation noise as such.
+            var[var <= 1e-10 * (total_sq / count)] = 0.0
+            zscores = (centered[lo - ext:] - mean) / np.sqrt(var)
+        zscores[(count < min_periods) | (count < 2) | (var == 0.0)] = np.nan
+        out[lo:hi] = zscores
+
+
+def segmented_rolling_zscore(
+    values: np.ndarray,
+    starts: np.ndarray,
+    window: int,
+    min_periods: Optional[int] = None,
+    use_jit: Optional[bool] = None,
+) -> np.ndarray:
+    """Rolling z-scores for many series laid end to end in ``values``.
+
+    ``starts`` holds the (sorted) offset of each series. ``use_jit`` forces
+    the compiled (True) or NumPy (False) path; by default Numba is used when
+    it is installed.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    starts = np.ascontiguousarray(starts, dtype=np.int64)
+    if min_periods is None:
+        min_periods = default_min_periods(window)
+    out = np.empty(len(values), dtype=np.float64)
+    if len(values) == 0:
+        return out
+
+    if use_jit is None:
+        use_jit = _zscore_segments_jit is not None
+    if use_jit:
+        if _zscore_segments_jit is None:
+            raise RuntimeError("Numba is not installed")
+        _zscore_segments_jit(values, starts, window, min_periods, out)
+    else:
+        _zscore_segments_numpy(values, starts, window, min_periods, out)
+    return out
+
+
+def rolling_zscore(
+    values: np.ndarray,
+    window: int,
+    min_periods: Optional[int] = None,
+    use_jit: Optional[bool] = None,
+) -> np.ndarray:
+    """Rolling z-scores of a 1-D series, or of every row of a 2-D array.
+
+    Matches ``(x - x.rolling(window, min_periods).mean()) /
+    x.rolling(window, min_periods).std()`` except that flat windows give NaN
+    instead of pandas' rounding-dependent 0 or huge values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return segmented_rolling_zscore(values, np.zeros(1, dtype=np.int64), window, min_periods, use_jit)
+    if values.ndim != 2:
+        raise ValueError(f"Expected a 1-D or 2-D array, got {values.ndim} dimensions")
+
+    rows, length = values.shape
+    if length == 0:
+        return np.empty(values.shape, dtype=np.float64)
+    starts = np.arange(rows, dtype=np.int64) * length
+    return segmented_rolling_zscore(values.reshape(-1), starts, window, min_periods, use_jit).reshape(rows, length)
@@ -1,11 +1,170 @@
+"""
+Unit and currency normalization.
+
+Prices arrive as "<currency>/<quantity><unit>" strings such as "RUB/kg",
+"RUB/10pcs" or "USD/lb". ``normalize_prices`` parses each distinct unit once
+(they are categorical, so there are only a handful), then converts every row
+with array lookups on the category codes: the quantity is scaled to a base
+unit (kg, l or pcs) and foreign currencies are converted to roubles with the
+Central Bank rate in force on the row's date, found with one ``merge_asof``.
+
+The result keeps ``price`` and ``unit`` as published and adds ``price_base``
+(roubles per base unit) and ``base_unit`` (e.g. "RUB/kg"). Rows whose unit
+cannot be parsed, or that have no known rate yet, get NaN.
+"""
 from __future__ import annotations
 
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+BASE_CURRENCY = "RUB"
+# Bump when the columns produced here change, so shared stores get rebuilt.
+NORMALIZATION_VERSION = "1"
+
+# unit -> (base unit, base units per unit)
+UNIT_FACTORS: dict[str, tuple[str, float]] = {
+    "kg": ("kg", 1.0),
+    "g": ("kg", 0.001),
+    "lb": ("kg", 0.45359237),
+    "l": ("l", 1.0),
+    "ml": ("l", 0.001),
+    "pcs": ("pcs", 1.0),
+    "pc": ("pcs", 1.0),
+    "dozen": ("pcs", 12.0),
+}
+UNIT_ALIASES = {"kilo": "kg", "liter": "l", "litre": "l", "piece": "pcs", "pieces": "pcs"}
+
+_UNIT_PATTERN = re.compile(r"^\s*([A-Za-z]{3})\s*/\s*(\d+(?:[.,]\d+)?)?\s*([A-Za-z]+)\s*$")
+
+
+@dataclass(frozen=True)
+class ParsedUnit:
+    currency: str
+    base_unit: str
+    # Base units in one priced quantity: "RUB/10pcs" -> 10, "RUB/500g" -> 0.5.
+    factor: float
+
+
+def parse_unit(text: str) -> Optional[ParsedUnit]:
+    """Parse "RUB/kg", "RUB/10pcs", "USD/500g" etc.; None if unrecognized."""
+    match = _UNIT_PATTERN.match(str(text))
+    if match is None:
+        return None
+    currency, quantity, unit = match.groups()
+    unit = UNIT_ALIASES.get(unit.lower(), unit.lower())
+    if unit not in UNIT_FACTORS:
+        return None
+    base_unit, per_unit = UNIT_FACTORS[unit]
+    amount = float(quantity.replace(",", ".")) if quantity else 1.0
+    return ParsedUnit(currency=currency.upper(), base_unit=base_unit, factor=amount * per_unit)
+
+
+def unit_table(units: pd.Index) -> pd.DataFrame:
+    """One row per distinct unit string: currency, base_unit, factor ("" / NaN if unparsed)."""
+    rows = []
+    for text in units:
+        parsed = parse_unit(text)
+        if parsed is None:
+            logger.warning(f"Unrecognized price unit {text!r}; its rows get no base price")
+            rows.append(("", "", np.nan))
+        else:
+            rows.append((parsed.currency, parsed.base_unit, parsed.factor))
+    return pd.DataFrame(rows, columns=["currency", "base_unit", "factor"], index=units)
 
-def normalize_prices(df: pd.DataFrame) -> pd.DataFrame:
-    """Placeholder for currency/unit normalization.
 
-    Future: apply FX from CBR and normalize units (kg/liter/etc.).
+def load_fx_rates(path: str | Path) -> pd.DataFrame:
+    """Rates file with columns date, currency, rate (roubles per one unit)."""
+    rates = pd.read_csv(path, parse_dates=["date"], dtype={"currency": "string", "rate": "float64"})
+    rates["currency"] = rates["currency"].str.upper()
+    return rates.sort_values("date", ignore_index=True)
+
+
+def normalization_stamp(rates_path: Optional[str] = None) -> dict[str, str]:
+    """Inputs besides the price CSV that the normalized frame depends on."""
+    rates_path = rates_path or get_settings().fx_rates_path
+    try:
+        stat = os.stat(rates_path)
+        rates = f"{stat.st_mtime_ns}:{stat.st_size}"
+    except OSError:
+        rates = "missing"
+    return {"normalization_version": NORMALIZATION_VERSION, "fx_rates": rates}
+
+
+def _fx_rates_on(
+    dates: np.ndarray,
+    currencies: np.ndarray,
+    rates: Optional[pd.DataFrame],
+) -> np.ndarray:
+    """Roubles per unit of ``currencies[i]`` on ``dates[i]`` (NaN if unknown)."""
+    if rates is None or rates.empty:
+        logger.warning(f"No FX rates loaded; {len(dates)} non-{BASE_CURRENCY} rows get no base price")
+        return np.full(len(dates), np.nan)
+
+    left = pd.DataFrame(
+        {
+            "date": pd.Series(dates).astype(rates["date"].dtype),
+            "currency": pd.Series(currencies, dtype="string"),
+            "row": np.arange(len(dates)),
+        }
+    ).sort_values("date", kind="stable")
+    if not rates["date"].is_monotonic_increasing:
+        rates = rates.sort_values("date", kind="stable")
+    joined = pd.merge_asof(left, rates, on="date", by="currency", direction="backward")
+    found = np.full(len(dates), np.nan)
+    found[joined["row"].to_numpy()] = joined["rate"].to_numpy(dtype=np.float64)
+
+    missing = int(np.isnan(found).sum())
+    if missing:
+        logger.warning(f"{missing} rows have no FX rate on or before their date")
+    return found
+
+
+def normalize_prices(df: pd.DataFrame, rates: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Add ``price_base`` and ``base_unit`` columns; see the module docstring.
+
+    ``rates`` defaults to the file at ``FX_RATES_PATH``, loaded only when the
+    frame has prices in a foreign currency.
     """
-    return df
+    if df.empty:
+        return df.assign(
+            price_base=pd.Series(dtype="float64"),
+            base_unit=pd.Series(dtype="category"),
+        )
+
+    units = df["unit"].astype("category")
+    table = unit_table(units.cat.categories)
+    codes = units.cat.codes.to_numpy()
+    known = codes >= 0
+    unit_currency = table["currency"].to_numpy(dtype=object)
+
+    # Everything per unit category is resolved on the small table, then
+    # broadcast to rows by indexing with the category codes.
+    factor = np.where(known, table["factor"].to_numpy()[codes], np.nan)
+    to_base = np.where(known & (unit_currency == BASE_CURRENCY)[codes], 1.0, np.nan)
+    foreign = np.flatnonzero(known & ((unit_currency != BASE_CURRENCY) & (unit_currency != ""))[codes])
+    if len(foreign):
+        if rates is None:
+            path = get_settings().fx_rates_path
+            rates = load_fx_rates(path) if os.path.exists(path) else None
+        dates = df["date"].to_numpy()[foreign]
+        to_base[foreign] = _fx_rates_on(dates, unit_currency[codes[foreign]], rates)
+    price_base = df["price"].to_numpy(dtype=np.float64) * to_base / factor
+
+    base_units = [f"{BASE_CURRENCY}/{base_unit}" if base_unit else "" for base_unit in table["base_unit"]]
+    base_categories = pd.Index([unit for unit in dict.fromkeys(base_units) if unit])
+    unit_to_base = base_categories.get_indexer(base_units)
+    base_codes = np.where(known, unit_to_base[codes], -1)
+    base_unit = pd.Categorical.from_codes(base_codes, categories=base_categories)
+
+    return df.assign(price_base=price_base, base_unit=base_unit)
@@ -0,0 +1,105 @@
+"""
+Append-only, month-partitioned price observations.
+
+Ingestion jobs append new dated observations to ``<root>/<YYYY-MM>.csv``
+instead of rewriting the main CSV. Rows whose (date, region, commodity) key is
+already present in the partition are skipped, so re-running a job is harmless
+and the first recorded observation for a key wins. Because files only ever
+grow, a running server can pick up new rows by reading just the bytes appended
+since it last looked (see ``PartitionTailer``).
+"""
+from __future__ import annotations
+
+import io
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["date", "region", "commodity", "price", "unit"]
+KEY_COLUMNS = ["date", "region", "commodity"]
+
+
+def _keys(df: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_frame(df[KEY_COLUMNS].astype(str))
+
+
+def append_observations(df: pd.DataFrame, root: str) -> pd.DataFrame:
+    """Append rows not yet recorded to their month partitions; return what was written."""
+    if df.empty:
+        return df.reindex(columns=COLUMNS)
+
+    batch = df[COLUMNS].copy()
+    batch["date"] = pd.to_datetime(batch["date"]).dt.strftime("%Y-%m-%d")
+    batch = batch.drop_duplicates(subset=KEY_COLUMNS, keep="last")
+
+    root_path = Path(root)
+    root_path.mkdir(parents=True, exist_ok=True)
+    written = []
+    for month, rows in batch.groupby(batch["date"].str[:7], sort=True):
+        path = root_path / f"{month}.csv"
+        exists = path.exists()
+        if exists:
+            existing = pd.read_csv(path, usecols=KEY_COLUMNS, dtype=str)
+            rows = rows[~_keys(rows).isin(_keys(existing))]
+        if rows.empty:
+            continue
+        rows.to_csv(path, mode="a", header=not exists, index=False)
+        written.append(rows)
+        logger.info(f"Appended {len(rows)} observations to {path}")
+
+    if not written:
+        return batch.iloc[:0]
+    return pd.concat(written, ignore_index=True)
+
+
+class PartitionTailer:
+    """Reads only the bytes appended to each partition since the previous call."""
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self._offsets: dict[str, int] = {}
+
+    def reset(self) -> None:
+        self._offsets.clear()
+
+    def sizes(self) -> dict[str, int]:
+        return {path.name: path.stat().st_size for path in sorted(self.root.glob("*.csv"))}
+
+    def seek(self, sizes: dict[str, int]) -> None:
+        """Treat everything up to ``sizes`` as already read."""
+        self._offsets = dict(sizes)
+
+    def changed(self) -> bool:
+        return any(
+            path.stat().st_size != self._offsets.get(path.name, 0)
+            for path in self.root.glob("*.csv")
+        )
+
+    def read_new(self) -> pd.DataFrame:
+        chunks = []
+        for path in sorted(self.root.glob("*.csv")):
+            offset = self._offsets.get(path.name, 0)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            # Only consume whole lines; a writer may be mid-row.
+            data = data[: data.rfind(b"\n") + 1]
+            if not data:
+                continue
+            self._offsets[path.name] = offset + len(data)
+            chunk = pd.read_csv(
+                io.BytesIO(data),
+                header=0 if offset == 0 else None,
+                names=COLUMNS,
+            )
+            chunks.append(chunk)
+
+        if not chunks:
+            return pd.DataFrame(columns=COLUMNS)
+        df = pd.concat(chunks, ignore_index=True)
+        df["date"] = pd.to_datetime(df["date"])
+        df["price"] = df["price"].astype(float)
+        return df
@@ -0,0 +1,210 @@
+"""
+Rebuild the price store in the background and swap it in atomically.
+
+Startup, the admin endpoints and the optional file watcher all go through the
+same ``Reloader``: it loads and normalizes a fresh frame, builds its index off
+the request path, and publishes it with a single reference assignment on the
+store, so readers see either the old data or the new data, never a mix.
+
+Besides full rebuilds from ``DATA_PATH``, the reloader merges observations
+appended to the month partitions (see partitions.py) by reading only the new
+rows, so routine ingestion never re-parses the whole history.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import pandas as pd
+
+from app.core.config import Settings, get_settings
+from app.core.metrics import LOAD_PHASE, load_phase
+from app.services.ingestion import added_rows, load_prices_from_csv, merge_prices
+from app.services.normalization import normalization_stamp, normalize_prices
+from app.services.partitions import PartitionTailer
+from app.services.shared_store import load_shared_prices
+from app.services.storage import DataStore, store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReloadStatus:
+    running: bool = False
+    reloads: int = 0
+    merges: int = 0
+    rows: int = 0
+    last_kind: Optional[str] = None
+    last_started: Optional[datetime] = None
+    last_finished: Optional[datetime] = None
+    last_duration_s: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class Reloader:
+    """Runs at most one rebuild or merge at a time and records how it went."""
+
+    def __init__(self, target: DataStore, settings: Settings) -> None:
+        self.target = target
+        self.settings = settings
+        self.partitions = PartitionTailer(settings.partitions_path)
+        self._lock = threading.Lock()
+        self._status = ReloadStatus()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def status(self) -> dict:
+        return asdict(self._status)
+
+    def build_prices(self) -> pd.DataFrame:
+        """Load and normalize the main CSV plus every partition."""
+
+        def build() -> pd.DataFrame:
+            df = load_prices_from_csv(self.settings.data_path)
+            with load_phase("normalize"):
+                df = normalize_prices(df)
+            self.partitions.reset()
+            with load_phase("partitions_read"):
+                appended = self.partitions.read_new()
+            if not appended.empty:
+                with load_phase("normalize"):
+                    appended = normalize_prices(appended)
+                df = merge_prices(df, appended)
+            return df
+
+        if self.settings.shared_store:
+            sizes = self.partitions.sizes()
+            df = load_shared_prices(
+                self.settings.data_path,
+                build,
+                extra_stamp={
+                    "partitions": ";".join(f"{name}:{size}" for name, size in sizes.items()),
+                    **normalization_stamp(self.settings.fx_rates_path),
+                },
+            )
+            self.partitions.seek(sizes)
+            return df
+        return build()
+
+    def merge_partitions(self) -> Optional[pd.DataFrame]:
+        """Fold newly appended partition rows into the current frame.
+
+        Returns None when nothing was appended. With a shared store every
+        worker must see the same file, so this republishes it instead.
+        """
+        if self.settings.shared_store:
+            return self.build_prices() if self.partitions.changed() else None
+        appended = self.partitions.read_new()
+        current = self.target.prices
+        if appended.empty or current is None:
+            return None
+        return merge_prices(current, normalize_prices(appended))
+
+    def reload(self) -> bool:
+        """Rebuild synchronously; returns False if another run is in progress."""
+        return self._run_locked("full", self.build_prices)
+
+    def merge(self) -> bool:
+        """Merge new partition rows synchronously; False if another run is in progress."""
+        return self._run_locked("incremental", self.merge_partitions)
+
+    def trigger(self, kind: str = "full") -> bool:
+        """Start a rebuild or merge on a background thread; False if one is already running."""
+        if not self._lock.acquire(blocking=False):
+            return False
+        build = self.build_prices if kind == "full" else self.merge_partitions
+
+        def run() -> None:
+            try:
+                self._run(kind, build)
+            except Exception:
+                pass  # already logged and recorded in the status
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, name=f"price-{kind}", daemon=True).start()
+        return True
+
+    def _run_locked(self, kind: str, build: Callable[[], Optional[pd.DataFrame]]) -> bool:
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._run(kind, build)
+        finally:
+            self._lock.release()
+        return True
+
+    def _run(self, kind: str, build: Callable[[], Optional[pd.DataFrame]]) -> None:
+        status = self._status
+        status.running = True
+        status.last_kind = kind
+        status.last_started = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            previous = self.target.prices
+            df = build()
+            if df is not None:
+                # Local merges only append rows; let listeners fold in just those.
+                incremental = kind == "incremental" and previous is not None and not self.settings.shared_store
+                self.target.publish(df, added_rows(previous, df) if incremental else None)
+        except Exception as e:
+            status.last_error = str(e)
+            logger.exception(f"Price {kind} reload failed; keeping previous data")
+            raise
+        else:
+            status.last_error = None
+            if df is not None:
+                status.rows = len(df)
+                if kind == "full":
+                    status.reloads += 1
+                else:
+                    status.merges += 1
+        finally:
+            status.running = False
+            status.last_finished = datetime.now(timezone.utc)
+            status.last_duration_s = time.perf_counter() - started
+            LOAD_PHASE.observe(status.last_duration_s, phase=f"{kind}_reload")
+        if df is not None:
+            logger.info(f"Swapped in {status.rows} rows after {status.last_duration_s:.3f}s {kind} rebuild")
+
+    def watch(self, interval: float) -> None:
+        """Poll the data sources every ``interval`` seconds and reload what changed."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        path = self.settings.data_path
+
+        def poll() -> None:
+            last_mtime = _mtime(path)
+            while not self._stop.wait(interval):
+                mtime = _mtime(path)
+                if mtime is not None and mtime != last_mtime:
+                    last_mtime = mtime
+                    logger.info(f"{path} changed; reloading price data")
+                    self.trigger("full")
+                elif self.partitions.changed():
+                    self.trigger("incremental")
+
+        self._watcher = threading.Thread(target=poll, name="price-watch", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+reloader = Reloader(store, get_settings())
@@ -4,7 +4,8 @@ Fetch and filter food price data from Rosstat API.
 Workflow:
 1. Fetch data from Rosstat/data.gov.ru API
 2. Filter to 7 commodities and 5 cities
-3. Save to CSV for application use
+3. Save to CSV for application use, or append new observations to the
+   month partitions (see partitions.py)
 4. Load from CSV on application startup
 """
 from __future__ import annotations
@@ -14,6 +15,9 @@ import pandas as pd
 from datetime import datetime, timedelta
 import logging
 
+from app.core.metrics import load_phase
+from app.services.partitions import append_observations
+
 logger = logging.getLogger(__name__)
 
 # Target commodities and cities for filtering
@@ -69,17 +73,23 @@ def fetch_rosstat_prices() -> pd.DataFrame | None:
         return None
 
 
+def _filter_targets(df: pd.DataFrame) -> pd.DataFrame:
+    return df[
+        (df["commodity"].isin(TARGET_COMMODITIES)) &
+        (df["region"].isin(TARGET_CITIES))
+    ].copy()
+
+
 def filter_and_save_to_csv(df: pd.DataFrame, output_path: str) -> pd.DataFrame:
     """
     Filter Rosstat data to selected commodities and 5 cities, then save to CSV.
     
     This function was used to generate the current CSV from Rosstat API data.
+    It rewrites output_path; use filter_and_append_partitions for routine
+    updates.
     """
     # Filter to target commodities and cities
-    df_filtered = df[
-        (df["commodity"].isin(TARGET_COMMODITIES)) &
-        (df["region"].isin(TARGET_CITIES))
-    ].copy()
+    df_filtered = _filter_targets(df)
     
     # Save filtered data
     df_filtered.to_csv(output_path, index=False)
@@ -88,6 +98,15 @@ def filter_and_save_to_csv(df: pd.DataFrame, output_path: str) -> pd.DataFrame:
     return df_filtered
 
 
+def filter_and_append_partitions(df: pd.DataFrame, partitions_path: str) -> pd.DataFrame:
+    """
+    Filter Rosstat data like filter_and_save_to_csv, but append only the
+    observations not yet recorded to the month partitions under
+    partitions_path. Returns the rows actually written.
+    """
+    return append_observations(_filter_targets(df), partitions_path)
+
+
 def fetch_with_fallback(sample_csv_path: str) -> pd.DataFrame:
     """
     Load pre-filtered CSV data (originally fetched from Rosstat and filtered).
@@ -101,8 +120,10 @@ def fetch_with_fallback(sample_csv_path: str) -> pd.DataFrame:
     # In production, you would periodically re-fetch and update this CSV
     logger.info(f"Loading pre-filtered Rosstat data from {sample_csv_path}")
     try:
-        df = pd.read_csv(sample_csv_path)
-        df["date"] = pd.to_datetime(df["date"])
+        with load_phase("csv_read"):
+            df = pd.read_csv(sample_csv_path)
+        with load_phase("date_parse"):
+            df["date"] = pd.to_datetime(df["date"])
         return df
     except Exception as e:
         logger.error(f"Failed to load CSV data: {e}")
@@ -0,0 +1,108 @@
+"""
+Shared, memory-mapped backing for the price store.
+
+With several uvicorn workers each process would otherwise hold a private copy
+of the prices frame. Instead, the first worker to start builds the normalized,
+index-sorted frame and publishes it as an Arrow IPC file; every worker then
+memory-maps that file read-only and wraps its column buffers without copying,
+so the pages live once in the OS page cache however many workers attach.
+
+Publishing replaces the file with ``os.replace``, so a reload swaps the
+mapping atomically: workers that re-attach see the new file while existing
+mappings keep the old inode alive until they are dropped.
+"""
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import pandas as pd
+
+from app.services.columnar_cache import ipc_metadata, pa, read_ipc_table, source_stamp, write_ipc
+from app.services.storage import PriceIndex
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def shared_path_for(source_path: str) -> Path:
+    source = Path(source_path)
+    return source.with_name(f"{source.name}.shared.arrow")
+
+
+@contextmanager
+def _publish_lock(path: Path) -> Iterator[None]:
+    """Serialize builders across worker processes on an adjacent lock file."""
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(f"{path.name}.lock"), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _column_view(column: "pa.ChunkedArray") -> object:
+    # A single-chunk column maps straight onto the file; anything else is
+    # concatenated (and therefore copied) first.
+    chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+    if pa.types.is_dictionary(chunk.type):
+        codes = chunk.indices.to_numpy(zero_copy_only=True)
+        return pd.Categorical.from_codes(codes, categories=chunk.dictionary.to_pylist())
+    if chunk.null_count == 0 and (
+        pa.types.is_floating(chunk.type)
+        or pa.types.is_integer(chunk.type)
+        or pa.types.is_timestamp(chunk.type)
+    ):
+        return chunk.to_numpy(zero_copy_only=True)
+    return chunk.to_pandas()
+
+
+def attach_shared_prices(path: Path) -> pd.DataFrame:
+    """Map a published file and wrap its numeric/date buffers without copying."""
+    table = read_ipc_table(path)
+    columns = {name: _column_view(table.column(name)) for name in table.column_names}
+    return pd.DataFrame(columns, copy=False)
+
+
+def publish_shared_prices(df: pd.DataFrame, path: Path, stamp: dict[str, str]) -> None:
+    """Write ``df`` in index order so attached frames need no re-sort."""
+    frame = PriceIndex.build(df).frame
+    write_ipc(frame, path, stamp)
+    logger.info(f"Published {len(frame)} rows to shared store {path}")
+
+
+def load_shared_prices(
+    source_path: str,
+    build: Callable[[], pd.DataFrame],
+    extra_stamp: Optional[dict[str, str]] = None,
+) -> pd.DataFrame:
+    """Attach to the shared file for ``source_path``, building it first if stale.
+
+    ``build`` returns the normalized frame; only one worker at a time runs it,
+    and the rest attach to what it published. ``extra_stamp`` adds inputs
+    besides the source file that must match for the published file to count
+    as fresh.
+    """
+    if pa is None:
+        raise RuntimeError("SHARED_STORE requires pyarrow")
+
+    path = shared_path_for(source_path)
+    with _publish_lock(path):
+        stamp = {**source_stamp(source_path), **(extra_stamp or {})}
+        fresh = False
+        if path.exists():
+            metadata = ipc_metadata(read_ipc_table(path))
+            fresh = all(metadata.get(key) == value for key, value in stamp.items())
+        if not fresh:
+            publish_shared_prices(build(), path, stamp)
+        return attach_shared_prices(path)
+
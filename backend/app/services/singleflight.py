@@ -0,0 +1,128 @@
+"""
+Request coalescing ("single flight") for identical expensive computations.
+
+When a dashboard opens, many clients ask for the same series at the same
+moment. A flight group runs the first call for a key and makes every
+concurrent caller with the same key wait for that call's result (or
+exception) instead of computing it again. Nothing is kept once the call
+finishes; caching stays with the LRU caches behind it.
+
+- ``SingleFlight`` coalesces across threads, for service functions that run
+  on the compute pool.
+- ``AsyncSingleFlight`` coalesces coroutines on the event loop, so duplicate
+  requests wait without taking a compute slot at all.
+
+Keys must include whatever identifies the data the result depends on
+(callers use ``id(index)``), so a reload in between never shares results
+across dataset versions.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class FlightStats:
+    # Calls that ran the computation themselves.
+    executed: int = 0
+    # Calls that waited for another caller's result instead.
+    coalesced: int = 0
+    failed: int = 0
+    in_flight: int = 0
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Thread-level coalescing of concurrent calls that share a key."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.stats = FlightStats()
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return ``fn()``, or the result of an identical call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats.executed += 1
+                self.stats.in_flight += 1
+            else:
+                self.stats.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.stats.in_flight -= 1
+                if call.error is not None:
+                    self.stats.failed += 1
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """Event-loop coalescing of concurrent coroutines that share a key."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.stats = FlightStats()
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        _registry[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()``, or the result of an identical call already running.
+
+        The call runs as its own task, so a caller going away (a dropped
+        connection) cancels only its own wait, not the others' result.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            self.stats.executed += 1
+            self.stats.in_flight += 1
+            task.add_done_callback(partial(self._finished, key))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        del self._calls[key]
+        self.stats.in_flight -= 1
+        if task.cancelled() or task.exception() is not None:
+            self.stats.failed += 1
+
+
+_registry: dict[str, SingleFlight | AsyncSingleFlight] = {}
+
+
+def flight_stats() -> dict[str, dict]:
+    """Executed, coalesced, failed and in-flight counts of every flight group."""
+    return {name: asdict(flight.stats) for name, flight in list(_registry.items())}
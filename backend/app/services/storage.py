@@ -1,13 +1,146 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable, Optional
+
+import numpy as np
 import pandas as pd
 
+from app.core.metrics import load_phase
+
+SeriesKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class PriceIndex:
+    """Prices sorted by (commodity, region, date) with per-series row ranges.
+
+    Every series occupies one contiguous block of ``frame``, so finding it is a
+    dict lookup and reading it is a slice of the underlying column arrays.
+    """
+
+    frame: pd.DataFrame
+    dates: np.ndarray
+    prices: np.ndarray
+    slices: dict[SeriesKey, slice] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "PriceIndex":
+        commodity_codes, commodities = pd.factorize(df["commodity"], sort=True)
+        region_codes, regions = pd.factorize(df["region"], sort=True)
+        series_codes = commodity_codes.astype(np.int64) * len(regions) + region_codes
+
+        dates = df["date"].to_numpy()
+        order = np.lexsort((dates, series_codes))
+        if not np.array_equal(order, np.arange(len(order))):
+            df = df.iloc[order]
+            series_codes = series_codes[order]
+        frame = df.reset_index(drop=True)
+
+        boundaries = np.flatnonzero(np.diff(series_codes)) + 1
+        starts = np.concatenate(([0], boundaries)) if len(frame) else np.empty(0, dtype=np.int64)
+        stops = np.concatenate((boundaries, [len(frame)])) if len(frame) else np.empty(0, dtype=np.int64)
+
+        slices: dict[SeriesKey, slice] = {}
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            code = int(series_codes[start])
+            key = (commodities[code // len(regions)], regions[code % len(regions)])
+            slices[key] = slice(start, stop)
+
+        return cls(
+            frame=frame,
+            dates=frame["date"].to_numpy(),
+            prices=frame["price"].to_numpy(dtype=np.float64),
+            slices=slices,
+        )
+
+    def date_range(
+        self,
+        bounds: slice,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        months: Optional[int] = None,
+    ) -> slice:
+        """Narrow a series' row range to ``start <= date <= end`` by binary search.
+
+        ``months`` further keeps only dates strictly within that many calendar
+        months of the last remaining date.
+        """
+        dates = self.dates[bounds]
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, "D"), side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, "D"), side="right"))
+        if months is not None and lo < hi:
+            cutoff = pd.Timestamp(dates[hi - 1]) - pd.DateOffset(months=months)
+            lo = max(lo, int(np.searchsorted(dates, cutoff.to_datetime64(), side="right")))
+        return slice(bounds.start + lo, bounds.start + max(lo, hi))
+
+    def series(
+        self,
+        commodity: str,
+        region: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        months: Optional[int] = None,
+    ) -> Optional[pd.DataFrame]:
+        """Return the date-sorted rows of one series, or None if it is unknown.
+
+        The optional date limits are applied with ``date_range``, so the
+        result is always a slice of ``frame`` and never a filtered copy.
+        """
+        bounds = self.slices.get((commodity, region))
+        if bounds is None:
+            return None
+        if start is not None or end is not None or months is not None:
+            bounds = self.date_range(bounds, start, end, months)
+        return self.frame.iloc[bounds]
+
 
-@dataclass
 class DataStore:
-    prices: Optional[pd.DataFrame] = None
+    """Process-wide holder of the loaded price table and its series index.
+
+    Assigning ``prices`` rebuilds the index before publishing it, and readers
+    get both through the single ``index`` reference, so they never observe a
+    frame paired with a stale index. ``version`` is bumped after every swap
+    (never before, so a version never names older data than it was issued
+    for), and reload listeners then run so derived caches can drop entries
+    computed from the previous data. During those listener calls ``appended``
+    holds the rows the swap added, if it only added rows (see ``publish``).
+    """
+
+    def __init__(self, prices: Optional[pd.DataFrame] = None) -> None:
+        self.index: Optional[PriceIndex] = None
+        self.version = 0
+        self.appended: Optional[pd.DataFrame] = None
+        self._reload_listeners: list[Callable[[], None]] = []
+        self.prices = prices
+
+    @property
+    def prices(self) -> Optional[pd.DataFrame]:
+        index = self.index
+        return None if index is None else index.frame
+
+    @prices.setter
+    def prices(self, df: Optional[pd.DataFrame]) -> None:
+        self.publish(df)
+
+    def publish(self, df: Optional[pd.DataFrame], appended: Optional[pd.DataFrame] = None) -> None:
+        """Swap in ``df``.
+
+        ``appended`` is for incremental merges: the rows of ``df`` that the
+        previous frame (version ``version - 1``) lacked, everything else being
+        unchanged. Listeners can fold just those rows into derived state.
+        """
+        with load_phase("index_build"):
+            self.index = None if df is None else PriceIndex.build(df)
+        self.appended = appended
+        self.version += 1
+        with load_phase("reload_listeners"):
+            for listener in self._reload_listeners:
+                listener()
+
+    def add_reload_listener(self, listener: Callable[[], None]) -> None:
+        self._reload_listeners.append(listener)
 
 
 store = DataStore()
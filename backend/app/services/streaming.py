@@ -0,0 +1,250 @@
+"""
+Incremental anomaly detection for continuously ingested prices.
+
+``StreamingDetector`` keeps, per series, the last ``window`` prices in a ring
+buffer together with their running mean and sum of squared deviations
+(Welford's update, extended to drop the value leaving the window). Appending
+a point is O(1) and yields the same rolling z-score as ``detect_anomalies``
+computes in batch, so an anomaly event is raised the moment a point arrives.
+
+The detector follows the store: after every reload or partition merge it is
+fed the rows dated after each series' last seen point. Its state can be
+written to a JSON snapshot and restored on startup; a series without state
+is warmed up silently from its last ``window`` rows instead.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.storage import PriceIndex, SeriesKey, store
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+# Re-derive mean/M2 from the buffer this often to shed rounding drift.
+_REFRESH_EVERY = 1024
+
+
+class RollingWindow:
+    """Rolling mean and sample variance of the last ``size`` values."""
+
+    __slots__ = ("size", "values", "mean", "m2", "_since_refresh")
+
+    def __init__(self, size: int, values: tuple[float, ...] = ()) -> None:
+        self.size = size
+        self.values: deque[float] = deque(values, maxlen=size)
+        self._refresh()
+
+    def _refresh(self) -> None:
+        n = len(self.values)
+        self.mean = math.fsum(self.values) / n if n else 0.0
+        self.m2 = math.fsum((value - self.mean) ** 2 for value in self.values)
+        self._since_refresh = 0
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.size:
+            old = self.values[0]
+            n = len(self.values) - 1
+            if n:
+                delta = old - self.mean
+                self.mean -= delta / n
+                self.m2 -= delta * (old - self.mean)
+            else:
+                self.mean = self.m2 = 0.0
+        self.values.append(value)
+        n = len(self.values)
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+
+        self._since_refresh += 1
+        if self._since_refresh >= _REFRESH_EVERY:
+            self._refresh()
+
+    def zscore(self, value: float, min_periods: int) -> float:
+        """z-score of ``value`` (the latest push) against the current window."""
+        n = len(self.values)
+        if n < min_periods or n < 2:
+            return math.nan
+        var = self.m2 / (n - 1)
+        # A flat window has zero spread; treat rounding noise as such.
+        if var <= 1e-12 * self.mean * self.mean or var <= 0.0:
+            return math.nan
+        return (value - self.mean) / math.sqrt(var)
+
+
+@dataclass(frozen=True)
+class AnomalyEvent:
+    seq: int
+    commodity: str
+    region: str
+    date: str
+    price: float
+    z_score: float
+
+
+@dataclass
+class _SeriesState:
+    window: RollingWindow
+    last_date: np.datetime64
+
+
+class StreamingDetector:
+    """Per-series rolling z-score state with O(1) appends and an event log."""
+
+    def __init__(self, window: int = 12, z_threshold: float = 2.0, max_events: int = 1000) -> None:
+        self.window = window
+        self.z_threshold = z_threshold
+        self.min_periods = max(3, window // 2)
+        self.events: deque[AnomalyEvent] = deque(maxlen=max_events)
+        self.last_seq = 0
+        self._series: dict[SeriesKey, _SeriesState] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def _push(self, key: SeriesKey, when: np.datetime64, price: float, emit: bool) -> Optional[AnomalyEvent]:
+        state = self._series.get(key)
+        if state is None:
+            state = self._series[key] = _SeriesState(RollingWindow(self.window), when)
+        elif when <= state.last_date:
+            return None  # already seen; merges never rewrite history
+        state.window.push(price)
+        state.last_date = when
+
+        z = state.window.zscore(price, self.min_periods)
+        if not emit or not abs(z) >= self.z_threshold:
+            return None
+        self.last_seq += 1
+        event = AnomalyEvent(
+            seq=self.last_seq,
+            commodity=key[0],
+            region=key[1],
+            date=str(when.astype("datetime64[D]")),
+            price=price,
+            z_score=z,
+        )
+        self.events.append(event)
+        return event
+
+    def update(self, commodity: str, region: str, when, price: float) -> Optional[AnomalyEvent]:
+        """Append one observation; returns the anomaly event it raised, if any.
+
+        Points dated on or before the series' last point are ignored.
+        """
+        with self._lock:
+            return self._push((commodity, region), np.datetime64(when, "us"), float(price), emit=True)
+
+    def catch_up(self, index: Optional[PriceIndex]) -> list[AnomalyEvent]:
+        """Feed every series the indexed rows it has not seen yet.
+
+        A series seen for the first time is warmed up from its last
+        ``window`` rows without raising events for that history.
+        """
+        if index is None:
+            return []
+        raised: list[AnomalyEvent] = []
+        with self._lock:
+            for key, bounds in index.slices.items():
+                dates = index.dates[bounds]
+                state = self._series.get(key)
+                if state is not None and dates[-1] < state.last_date:
+                    del self._series[key]  # history was rewritten; start over
+                    state = None
+                if state is None:
+                    lo, emit = max(0, len(dates) - self.window), False
+                else:
+                    lo, emit = int(np.searchsorted(dates, state.last_date, side="right")), True
+                prices = index.prices[bounds]
+                for position in range(lo, len(dates)):
+                    event = self._push(key, dates[position], float(prices[position]), emit)
+                    if event is not None:
+                        raised.append(event)
+        return raised
+
+    def events_since(self, seq: int = 0, limit: Optional[int] = None) -> list[AnomalyEvent]:
+        with self._lock:
+            events = [event for event in self.events if event.seq > seq]
+        return events if limit is None else events[:limit]
+
+    def snapshot(self) -> dict:
+        """JSON-serializable state: window buffers, last dates and recent events."""
+        with self._lock:
+            return {
+                "version": SNAPSHOT_VERSION,
+                "window": self.window,
+                "z_threshold": self.z_threshold,
+                "last_seq": self.last_seq,
+                "series": [
+                    {
+                        "commodity": commodity,
+                        "region": region,
+                        "last_date": str(state.last_date),
+                        "values": list(state.window.values),
+                    }
+                    for (commodity, region), state in self._series.items()
+                ],
+                "events": [asdict(event) for event in self.events],
+            }
+
+    def restore(self, snapshot: dict) -> bool:
+        """Load a snapshot; returns False (keeping current state) if it does not fit."""
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("window") != self.window:
+            return False
+        with self._lock:
+            self._series = {
+                (entry["commodity"], entry["region"]): _SeriesState(
+                    RollingWindow(self.window, tuple(entry["values"])),
+                    np.datetime64(entry["last_date"], "us"),
+                )
+                for entry in snapshot["series"]
+            }
+            self.events.clear()
+            self.events.extend(AnomalyEvent(**event) for event in snapshot["events"])
+            self.last_seq = snapshot["last_seq"]
+        return True
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load(self, path: str | Path) -> bool:
+        try:
+            snapshot = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.info(f"No usable detector snapshot at {path}: {e}")
+            return False
+        restored = self.restore(snapshot)
+        if not restored:
+            logger.info(f"Ignoring detector snapshot at {path}: different version or window")
+        return restored
+
+
+_settings = get_settings()
+detector = StreamingDetector(_settings.stream_window, _settings.stream_z_threshold)
+
+
+def _follow_store() -> None:
+    events = detector.catch_up(store.index)
+    if events:
+        logger.info(f"Streaming detector raised {len(events)} anomaly events")
+    if _settings.stream_state_path:
+        detector.save(_settings.stream_state_path)
+
+
+store.add_reload_listener(_follow_store)
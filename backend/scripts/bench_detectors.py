@@ -0,0 +1,116 @@
+"""
+Benchmark the anomaly detectors: accuracy on a labeled fixture and throughput.
+
+Scores ``fixtures/labeled_prices.csv`` (monthly series with seasonal produce
+and injected spikes marked in ``is_anomaly``) with every registered method
+and prints precision/recall at ``--z``, then times each method over a
+synthetic table of ``--rows`` rows:
+
+    python scripts/bench_detectors.py --z 3 --rows 1000000
+
+``--write-fixture`` regenerates the fixture from a fixed seed.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.services.anomaly import scan_anomalies  # noqa: E402
+from app.services.detectors import detector_names, get_detector  # noqa: E402
+from app.services.storage import PriceIndex  # noqa: E402
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "labeled_prices.csv"
+REGIONS = ["Moscow", "Saint Petersburg", "Kazan", "Novosibirsk", "Yekaterinburg"]
+# commodity -> (base price, unit, seasonal amplitude)
+COMMODITIES = {
+    "Tomatoes": (180.0, "RUB/kg", 0.35),
+    "Cucumbers": (140.0, "RUB/kg", 0.40),
+    "Strawberries": (450.0, "RUB/kg", 0.45),
+    "Potatoes": (45.0, "RUB/kg", 0.20),
+    "Milk": (85.0, "RUB/l", 0.0),
+    "Bread": (55.0, "RUB/loaf", 0.0),
+    "Eggs": (95.0, "RUB/10pcs", 0.05),
+    "Chicken Breast": (380.0, "RUB/kg", 0.0),
+}
+
+
+def build_fixture(seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2016-01-01", "2025-12-01", freq="MS")
+    months = np.arange(len(dates))
+    frames = []
+    for commodity, (base, unit, amplitude) in COMMODITIES.items():
+        for region in REGIONS:
+            level = base * rng.uniform(0.9, 1.15) * (1.006 ** months)
+            season = 1 + amplitude * np.cos(2 * np.pi * (dates.month.to_numpy() - 1.5) / 12)
+            price = level * season * (1 + rng.normal(0, 0.015, len(dates)))
+            labels = rng.random(len(dates)) < 0.02
+            labels[:12] = False
+            price[labels] *= 1 + rng.choice([-1, 1], labels.sum()) * rng.uniform(0.15, 0.35, labels.sum())
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "date": dates,
+                        "region": region,
+                        "commodity": commodity,
+                        "price": price.round(2),
+                        "unit": unit,
+                        "is_anomaly": labels.astype(int),
+                    }
+                )
+            )
+    return pd.concat(frames, ignore_index=True)
+
+
+def accuracy(fixture, z, window):
+    index = PriceIndex.build(fixture)
+    truth = index.frame.loc[index.frame["is_anomaly"] == 1, ["commodity", "region", "date"]]
+    truth = set(map(tuple, truth.astype({"commodity": str, "region": str}).to_numpy()))
+    print(f"{'method':<10}{'flagged':>9}{'precision':>11}{'recall':>8}{'F1':>7}")
+    for method in detector_names():
+        found = scan_anomalies(index, window=window, z_threshold=z, method=method)
+        flagged = set(map(tuple, found[["commodity", "region", "date"]].to_numpy()))
+        hits = len(flagged & truth)
+        precision = hits / len(flagged) if flagged else 0.0
+        recall = hits / len(truth) if truth else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if hits else 0.0
+        print(f"{method:<10}{len(flagged):>9}{precision:>11.2f}{recall:>8.2f}{f1:>7.2f}")
+
+
+def throughput(rows, window, series_length=120):
+    rng = np.random.default_rng(0)
+    values = 100 + np.cumsum(rng.normal(0, 1, rows))
+    starts = np.arange(0, rows, series_length)
+    offsets = np.arange(rows) - np.repeat(starts, np.diff(np.append(starts, rows)))
+    dates = np.datetime64("2000-01", "M") + offsets
+    print(f"\n{rows:,} rows in {len(starts):,} series of {series_length}")
+    print(f"{'method':<10}{'seconds':>9}{'Mrows/s':>9}")
+    for method in detector_names():
+        started = time.perf_counter()
+        get_detector(method)(values, starts, dates, window)
+        elapsed = time.perf_counter() - started
+        print(f"{method:<10}{elapsed:>9.3f}{rows / elapsed / 1e6:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--z", type=float, default=3.0)
+    parser.add_argument("--window", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--write-fixture", action="store_true")
+    args = parser.parse_args()
+
+    if args.write_fixture:
+        build_fixture().to_csv(FIXTURE, index=False, date_format="%Y-%m-%d")
+        print(f"Wrote {FIXTURE}")
+    fixture = pd.read_csv(FIXTURE, parse_dates=["date"])
+    accuracy(fixture, args.z, args.window)
+    throughput(args.rows, args.window)
+
+
+if __name__ == "__main__":
+    main()
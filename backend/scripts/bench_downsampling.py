@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: raw vs. resampled/LTTB-downsampled /api/prices payloads.
+
+Builds a synthetic daily series spanning ``--years`` years, then for each
+reduction prints the point count, JSON payload size and the time to reduce
+and serialize it (first call, i.e. before the per-series cache kicks in):
+
+    python scripts/bench_downsampling.py --years 20
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.api.responses import price_series_payload  # noqa: E402
+from app.services.downsampling import downsample_series  # noqa: E402
+from app.services.storage import PriceIndex  # noqa: E402
+
+CASES = [
+    ("raw", None, "mean", None),
+    ("week mean", "week", "mean", None),
+    ("week ohlc", "week", "ohlc", None),
+    ("month mean", "month", "mean", None),
+    ("lttb 1000", None, "mean", 1000),
+    ("week + lttb 500", "week", "mean", 500),
+]
+
+
+def synthetic_index(years):
+    dates = pd.date_range("2000-01-01", periods=365 * years, freq="D")
+    walk = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.5, len(dates)))
+    frame = pd.DataFrame(
+        {"date": dates, "region": "Kazan", "commodity": "Milk", "price": walk, "unit": "RUB/l"}
+    )
+    return PriceIndex.build(frame)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=20)
+    args = parser.parse_args()
+
+    index = synthetic_index(args.years)
+    rows = index.slices[("Milk", "Kazan")]
+
+    print(f"{'reduction':<18}{'points':>8}{'JSON KiB':>10}{'ms':>9}")
+    for name, resolution, aggregate, max_points in CASES:
+        started = time.perf_counter()
+        if resolution is None and max_points is None:
+            frame = index.frame.iloc[rows]
+        else:
+            frame = downsample_series(index, rows, resolution, aggregate, max_points)
+        payload = json.dumps(price_series_payload(frame, "Kazan", "Milk"))
+        elapsed = time.perf_counter() - started
+        print(f"{name:<18}{len(frame):>8}{len(payload) / 1024:>10.0f}{elapsed * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
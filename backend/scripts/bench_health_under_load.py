@@ -0,0 +1,84 @@
+"""
+Load check: /api/health latency while anomaly scans saturate the compute pool.
+
+Loads a synthetic table into the store, keeps ``--scans`` concurrent
+/api/anomalies/scan requests in flight (each with a different window, so
+none is served from cache) and meanwhile polls /api/health, printing its
+latency percentiles and the compute pool counters:
+
+    python scripts/bench_health_under_load.py --series 400 --points 2000 --scans 16
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.main import create_app  # noqa: E402
+from app.services.executor import compute  # noqa: E402
+from app.services.storage import store  # noqa: E402
+
+
+def synthetic_prices(series: int, points: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2000-01-01", periods=points, freq="D")
+    return pd.DataFrame(
+        {
+            "date": np.tile(dates, series),
+            "region": np.repeat([f"Region {i % 40}" for i in range(series)], points),
+            "commodity": np.repeat([f"Commodity {i // 40}" for i in range(series)], points),
+            "price": 100 + rng.standard_normal(series * points).cumsum() % 50,
+            "unit": "RUB/kg",
+        }
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--series", type=int, default=400)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=16, help="Concurrent scan requests")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    app = create_app()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    store.prices = synthetic_prices(args.series, args.points)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + args.seconds
+        statuses: dict[int, int] = {}
+
+        async def scan_forever(worker: int) -> None:
+            window = 3 + worker
+            while time.perf_counter() < deadline:
+                response = await client.get("/api/anomalies/scan", params={"window": window, "top_k": 10})
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                window = window % 49 + 3
+
+        async def poll_health() -> list[float]:
+            latencies = []
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get("/api/health")
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+            return latencies
+
+        results = await asyncio.gather(poll_health(), *(scan_forever(i) for i in range(args.scans)))
+
+    latencies = np.array(results[0]) * 1e3
+    print(f"/health: {len(latencies)} requests, p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p99 {np.percentile(latencies, 99):.2f} ms, max {latencies.max():.2f} ms")
+    print(f"scan responses by status: {statuses}")
+    print(f"compute pools: {compute.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
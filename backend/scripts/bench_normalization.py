@@ -0,0 +1,55 @@
+"""
+Micro-benchmark: unit and currency normalization of a large price table.
+
+Builds ``--rows`` synthetic observations over a mix of rouble and foreign
+units plus a daily rates table, then times ``normalize_prices``:
+
+    python scripts/bench_normalization.py --rows 5000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.services.normalization import normalize_prices  # noqa: E402
+
+UNITS = ["RUB/kg", "RUB/l", "RUB/10pcs", "RUB/500g", "USD/lb", "EUR/l", "CNY/kg"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--days", type=int, default=3650)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    first = pd.Timestamp("2015-01-01")
+    days = pd.date_range(first, periods=args.days, freq="D")
+    rates = pd.DataFrame(
+        {
+            "date": np.tile(days, 3),
+            "currency": pd.Series(np.repeat(["USD", "EUR", "CNY"], args.days), dtype="string"),
+            "rate": np.concatenate([np.full(args.days, 90.0), np.full(args.days, 98.0), np.full(args.days, 12.5)]),
+        }
+    ).sort_values("date", ignore_index=True)
+    df = pd.DataFrame(
+        {
+            "date": first + pd.to_timedelta(rng.integers(0, args.days, args.rows), unit="D"),
+            "price": rng.uniform(10, 500, args.rows),
+            "unit": pd.Categorical.from_codes(rng.integers(0, len(UNITS), args.rows), categories=UNITS),
+        }
+    )
+
+    started = time.perf_counter()
+    out = normalize_prices(df, rates)
+    elapsed = time.perf_counter() - started
+    print(f"{args.rows:,} rows normalized in {elapsed:.2f}s ({args.rows / elapsed / 1e6:.1f}M rows/s)")
+    print(out["base_unit"].value_counts().to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Micro-benchmark: streaming price extraction vs. the BeautifulSoup path.
+
+Runs both extractors over the saved fixture pages and over larger pages built
+by repeating the fixture's result cards, checks they agree, and prints the
+per-page time of each:
+
+    python scripts/bench_price_extraction.py --repeat 20
+"""
+import argparse
+import re
+import timeit
+from pathlib import Path
+
+from price_extraction import extract_price, extract_price_soup
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+CARD = re.compile(r"\s*<article.*?</article>\n", re.S)
+
+
+def scaled_page(html, cards):
+    """Repeat the result cards of ``html`` until the page holds ``cards`` of them."""
+    found = CARD.findall(html)
+    body = "".join(found[i % len(found)] for i in range(cards))
+    start = html.index(found[0])
+    end = html.index(found[-1]) + len(found[-1])
+    return html[:start] + body + html[end:]
+
+
+def pages():
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        yield path.name, html
+        for cards in (48, 480):
+            yield f"{path.stem} x{cards}", scaled_page(html, cards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'page':<34}{'KiB':>8}{'soup ms':>10}{'stream ms':>11}{'speedup':>9}")
+    for name, html in pages():
+        expected = extract_price_soup(html)
+        if extract_price(html) != expected:
+            raise SystemExit(f"{name}: extractors disagree")
+        soup = timeit.timeit(lambda: extract_price_soup(html), number=args.repeat) / args.repeat
+        stream = timeit.timeit(lambda: extract_price(html), number=args.repeat) / args.repeat
+        print(
+            f"{name:<34}{len(html.encode()) / 1024:>8.0f}{soup * 1e3:>10.2f}"
+            f"{stream * 1e3:>11.2f}{soup / stream:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Download official Central Bank of Russia exchange rates into the FX rates file.
+
+Writes ``date,currency,rate`` rows (roubles per one unit of the currency, on
+the date the rate took effect) for the requested currencies and period, in
+the format ``normalize_prices`` reads from ``FX_RATES_PATH``:
+
+    python scripts/fetch_cbr_rates.py --start 2023-01-01 --currencies USD EUR CNY
+"""
+import argparse
+import csv
+import sys
+import urllib.request
+import xml.etree.ElementTree as ET
+from datetime import date, datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.core.config import get_settings  # noqa: E402
+
+DYNAMIC_URL = "https://www.cbr.ru/scripts/XML_dynamic.asp?date_req1={start}&date_req2={end}&VAL_NM_RQ={code}"
+# CBR internal currency codes.
+CBR_CODES = {"USD": "R01235", "EUR": "R01239", "CNY": "R01375", "KZT": "R01335", "BYN": "R01090B"}
+
+
+def fetch_rates(currency: str, start: date, end: date) -> list[tuple[str, str, float]]:
+    url = DYNAMIC_URL.format(start=start.strftime("%d/%m/%Y"), end=end.strftime("%d/%m/%Y"), code=CBR_CODES[currency])
+    with urllib.request.urlopen(url, timeout=30) as response:
+        root = ET.fromstring(response.read())
+    rows = []
+    for record in root.iter("Record"):
+        day = datetime.strptime(record.get("Date"), "%d.%m.%Y").date()
+        nominal = float(record.findtext("Nominal").replace(",", "."))
+        value = float(record.findtext("Value").replace(",", "."))
+        rows.append((day.isoformat(), currency, value / nominal))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2023, 1, 1))
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--currencies", nargs="+", default=["USD", "EUR", "CNY"], choices=sorted(CBR_CODES))
+    parser.add_argument("--out", default=get_settings().fx_rates_path)
+    args = parser.parse_args()
+
+    rows = []
+    for currency in args.currencies:
+        fetched = fetch_rates(currency, args.start, args.end)
+        print(f"{currency}: {len(fetched)} rates")
+        rows.extend(fetched)
+    rows.sort()
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "currency", "rate"])
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} rows to {out}")
+
+
+if __name__ == "__main__":
+    main()
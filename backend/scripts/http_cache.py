@@ -0,0 +1,136 @@
+"""
+On-disk HTTP cache for scraper runs.
+
+Each URL is stored as ``<sha1>.body`` plus ``<sha1>.json`` metadata (ETag,
+Last-Modified, when it was stored and last used). Entries younger than the TTL
+are served without a request; older ones are revalidated with
+If-None-Match / If-Modified-Since, so an unchanged page costs a 304 instead of
+a full download. The total body size is kept under ``max_bytes`` by evicting
+the least recently used entries.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class CachedPage:
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    size: int
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    fresh_hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    evicted: int = 0
+    saved_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.fresh_hits + self.revalidated + self.misses
+        return (self.fresh_hits + self.revalidated) / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"cache: {self.fresh_hits} fresh, {self.revalidated} revalidated (304), "
+            f"{self.misses} misses, {self.evicted} evicted; hit rate {self.hit_rate:.0%}, "
+            f"{self.saved_bytes / 1024:.0f} KiB not re-downloaded"
+        )
+
+
+@dataclass
+class HttpCache:
+    root: Path
+    ttl: float = 6 * 3600
+    max_bytes: int = 64 * 1024 * 1024
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    def __post_init__(self) -> None:
+        self.root = Path(self.root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.evict()
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            text = body_path.read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            return None
+        os.utime(meta_path)  # last use, for LRU eviction
+        return CachedPage(url=url, text=text, **meta)
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return time.time() - page.stored_at < self.ttl
+
+    def store(self, url: str, text: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        if not etag and not last_modified and self.ttl <= 0:
+            return
+        meta_path, body_path = self._paths(url)
+        body = text.encode("utf-8")
+        body_path.write_bytes(body)
+        meta = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "size": len(body),
+        }
+        meta_path.write_text(json.dumps(meta))
+        self.evict()
+
+    def refresh(self, page: CachedPage) -> None:
+        """Record a successful revalidation: the entry is fresh again."""
+        page.stored_at = time.time()
+        meta_path, _ = self._paths(page.url)
+        meta = {
+            "etag": page.etag,
+            "last_modified": page.last_modified,
+            "stored_at": page.stored_at,
+            "size": page.size,
+        }
+        meta_path.write_text(json.dumps(meta))
+
+    def evict(self) -> None:
+        entries = []
+        total = 0
+        for meta_path in self.root.glob("*.json"):
+            body_path = meta_path.with_suffix(".body")
+            try:
+                size = body_path.stat().st_size
+                used = meta_path.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((used, meta_path, body_path, size))
+            total += size
+
+        for _, meta_path, body_path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            meta_path.unlink(missing_ok=True)
+            body_path.unlink(missing_ok=True)
+            total -= size
+            self.stats.evicted += 1
@@ -0,0 +1,190 @@
+"""
+Price extraction from market search pages.
+
+``extract_price`` matches the price selectors against a streaming parse: the
+selectors are compiled once into attribute predicates, the page is fed to an
+lxml parser target in chunks, and feeding stops as soon as the answer can no
+longer change. No tree is built. The result is the same as running
+``select_one`` for each selector in priority order, which is what
+``extract_price_soup`` (the reference implementation) does.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Optional
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - falls back to html.parser
+    etree = None
+
+PRICE_SELECTORS = [
+    '[data-auto="snippet-price-current"]',
+    '[data-auto="mainPrice"]',
+    'span[data-auto="snippet-price"]',
+    'div[data-zone-name="price"] span',
+]
+
+CHUNK_SIZE = 16 * 1024
+
+_COMPOUND = re.compile(r'^(?P<tag>[a-z0-9]*)(?:\[(?P<attr>[\w-]+)="(?P<value>[^"]*)"\])?$')
+
+
+@dataclass(frozen=True)
+class _Compound:
+    tag: Optional[str]
+    attr: Optional[str]
+    value: Optional[str]
+
+    def matches(self, tag: str, attrib: dict) -> bool:
+        if self.tag and tag != self.tag:
+            return False
+        return self.attr is None or attrib.get(self.attr) == self.value
+
+
+def compile_selector(selector: str) -> tuple[_Compound, ...]:
+    """Compile ``tag[attr="value"]`` parts joined by descendant combinators."""
+    parts = []
+    for part in selector.split():
+        match = _COMPOUND.match(part)
+        if match is None:
+            raise ValueError(f"Unsupported selector: {selector!r}")
+        parts.append(_Compound(match["tag"] or None, match["attr"], match["value"]))
+    return tuple(parts)
+
+
+def _parse_price(text: str) -> Optional[float]:
+    price_str = ''.join(c for c in text if c.isdigit() or c == '.')
+    return float(price_str) if price_str else None
+
+
+class PriceTarget:
+    """Parser target tracking the first match of each selector.
+
+    A selector is decided once its first matching element has closed. The
+    answer is known as soon as some selector decided on a price and every
+    higher-priority selector is decided too.
+    """
+
+    def __init__(self, selectors: list[tuple[_Compound, ...]]) -> None:
+        self.selectors = selectors
+        self.stack: list[tuple[str, dict]] = []
+        # For each selector: None (no match yet), depth being captured, or final text.
+        self.capture_depth: list[Optional[int]] = [None] * len(selectors)
+        self.texts: list[Optional[list[str]]] = [None] * len(selectors)
+        self.decided: list[bool] = [False] * len(selectors)
+        self.prices: list[Optional[float]] = [None] * len(selectors)
+
+    @property
+    def done(self) -> bool:
+        for decided, price in zip(self.decided, self.prices):
+            if not decided:
+                return False
+            if price is not None:
+                return True
+        return True
+
+    def result(self) -> Optional[float]:
+        for price in self.prices:
+            if price is not None:
+                return price
+        return None
+
+    def _matches(self, selector: tuple[_Compound, ...], tag: str, attrib: dict) -> bool:
+        if not selector[-1].matches(tag, attrib):
+            return False
+        ancestors = iter(reversed(self.stack))
+        for part in reversed(selector[:-1]):
+            if not any(part.matches(t, a) for t, a in ancestors):
+                return False
+        return True
+
+    def start(self, tag, attrib):
+        attrib = dict(attrib)
+        for i, selector in enumerate(self.selectors):
+            if self.texts[i] is None and self._matches(selector, tag, attrib):
+                self.texts[i] = []
+                self.capture_depth[i] = len(self.stack)
+        self.stack.append((tag, attrib))
+
+    def end(self, tag):
+        if not self.stack:
+            return
+        self.stack.pop()
+        depth = len(self.stack)
+        for i, capture_depth in enumerate(self.capture_depth):
+            if capture_depth == depth and not self.decided[i]:
+                self.decided[i] = True
+                self.capture_depth[i] = None
+                self.prices[i] = _parse_price("".join(self.texts[i]))
+
+    def data(self, text):
+        for i, capture_depth in enumerate(self.capture_depth):
+            if capture_depth is not None:
+                self.texts[i].append(text.strip())
+
+    def close(self):
+        # Unclosed matches at EOF still count, as they would in a parsed tree.
+        for i, capture_depth in enumerate(self.capture_depth):
+            if capture_depth is not None and not self.decided[i]:
+                self.decided[i] = True
+                self.prices[i] = _parse_price("".join(self.texts[i]))
+        return self.result()
+
+
+class _StdlibFeeder(HTMLParser):
+    """Drives a ``PriceTarget`` from html.parser when lxml is unavailable."""
+
+    def __init__(self, target: PriceTarget) -> None:
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, {name: value or "" for name, value in attrs})
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+_COMPILED = [compile_selector(selector) for selector in PRICE_SELECTORS]
+
+
+def extract_price(html: str, chunk_size: int = CHUNK_SIZE) -> Optional[float]:
+    """Return the first price found in a search results page, or None."""
+    if not html:
+        return None
+    target = PriceTarget(_COMPILED)
+    if etree is not None:
+        parser = etree.HTMLParser(target=target)
+        feed = parser.feed
+    else:
+        parser = _StdlibFeeder(target)
+        feed = parser.feed
+
+    for offset in range(0, len(html), chunk_size):
+        feed(html[offset:offset + chunk_size])
+        if target.done:
+            return target.result()
+    if etree is None:
+        parser.close()
+        return target.close()
+    return parser.close()
+
+
+def extract_price_soup(html: str) -> Optional[float]:
+    """Reference implementation: full BeautifulSoup tree, one select_one per selector."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'lxml')
+    for selector in PRICE_SELECTORS:
+        price_elem = soup.select_one(selector)
+        if price_elem:
+            price = _parse_price(price_elem.get_text(strip=True))
+            if price is not None:
+                return price
+    return None
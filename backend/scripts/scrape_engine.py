@@ -0,0 +1,212 @@
+"""
+Concurrent fetch engine for the market scrapers.
+
+Requests run on one shared ``httpx.AsyncClient`` (so connections are reused),
+limited per host by a semaphore and a token-bucket rate limiter. Failed
+requests and 429/5xx responses are retried with exponential backoff plus
+jitter. With an ``HttpCache``, fresh pages skip the network and stale ones are
+revalidated conditionally. ``ScrapeStats`` summarizes throughput at the end of
+a run.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from http_cache import HttpCache
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class FetchJob:
+    url: str
+    tag: object = None
+
+
+@dataclass
+class FetchResult:
+    job: FetchJob
+    status: Optional[int]
+    text: Optional[str]
+    attempts: int
+    elapsed: float
+    error: Optional[str] = None
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        if self.status == 304:
+            return self.text is not None
+        return self.status is not None and 200 <= self.status < 300
+
+
+@dataclass
+class ScrapeStats:
+    requests: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+
+    def summary(self) -> str:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        rate = self.requests / elapsed if elapsed > 0 else 0.0
+        return (
+            f"{self.requests} requests ({self.succeeded} ok, {self.failed} failed, "
+            f"{self.retries} retries), {self.bytes / 1024:.0f} KiB in {elapsed:.1f}s "
+            f"= {rate:.1f} req/s"
+        )
+
+
+class ScrapeEngine:
+    def __init__(
+        self,
+        headers: Optional[dict[str, str]] = None,
+        per_host_concurrency: int = 4,
+        rate: float = 2.0,
+        burst: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10.0,
+        cache: Optional[HttpCache] = None,
+    ) -> None:
+        self.headers = headers or {}
+        self.per_host_concurrency = per_host_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = ScrapeStats()
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _limits_for(self, url: str) -> tuple[asyncio.Semaphore, TokenBucket]:
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._semaphores[host], self._buckets[host]
+
+    async def fetch(self, client: httpx.AsyncClient, job: FetchJob) -> FetchResult:
+        started = time.monotonic()
+        cached = self.cache.lookup(job.url) if self.cache is not None else None
+        if cached is not None and self.cache.is_fresh(cached):
+            self.cache.stats.fresh_hits += 1
+            self.cache.stats.saved_bytes += cached.size
+            self.stats.succeeded += 1
+            return FetchResult(job, 200, cached.text, 0, time.monotonic() - started, from_cache=True)
+
+        semaphore, bucket = self._limits_for(job.url)
+        headers = cached.conditional_headers() if cached is not None else {}
+        error: Optional[str] = None
+        response: Optional[httpx.Response] = None
+
+        for attempt in range(1, self.retries + 2):
+            if attempt > 1:
+                self.stats.retries += 1
+                delay = self.backoff * 2 ** (attempt - 2)
+                await asyncio.sleep(delay + random.uniform(0, delay))
+            async with semaphore:
+                await bucket.acquire()
+                self.stats.requests += 1
+                try:
+                    response = await client.get(job.url, headers=headers)
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {e}"
+                    response = None
+                    continue
+            self.stats.bytes += len(response.content)
+            if response.status_code not in RETRY_STATUSES:
+                break
+            error = f"HTTP {response.status_code}"
+
+        text = None if response is None else response.text
+        if self.cache is not None and response is not None:
+            if response.status_code == 304 and cached is not None:
+                text = cached.text
+                self.cache.refresh(cached)
+                self.cache.stats.revalidated += 1
+                self.cache.stats.saved_bytes += cached.size
+            else:
+                self.cache.stats.misses += 1
+                if response.status_code == 200:
+                    self.cache.store(
+                        job.url,
+                        text,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                    )
+
+        result = FetchResult(
+            job=job,
+            status=None if response is None else response.status_code,
+            text=text,
+            attempts=attempt,
+            elapsed=time.monotonic() - started,
+            from_cache=response is not None and response.status_code == 304,
+        )
+        if result.ok:
+            self.stats.succeeded += 1
+        else:
+            self.stats.failed += 1
+            result.error = error if response is None else f"HTTP {response.status_code}"
+        return result
+
+    async def run(
+        self,
+        jobs: Iterable[FetchJob],
+        on_result: Optional[Callable[[FetchResult], None]] = None,
+    ) -> list[FetchResult]:
+        """Fetch every job concurrently; results come back in job order.
+
+        ``on_result`` is called as each fetch completes, e.g. to report progress.
+        """
+        self.stats = ScrapeStats()
+
+        async def fetch_and_report(client: httpx.AsyncClient, job: FetchJob) -> FetchResult:
+            result = await self.fetch(client, job)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        async with httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+        ) as client:
+            results = await asyncio.gather(*(fetch_and_report(client, job) for job in jobs))
+        self.stats.finished = time.monotonic()
+        return list(results)
@@ -1,14 +1,36 @@
 """
 Scrape food prices from Yandex Market for Russian cities.
+
+Results are appended to the month partitions under app/data/partitions, so
+earlier runs are kept and re-running on the same day adds nothing twice.
+
+All product/city pages are fetched concurrently by scrape_engine.py, with
+per-host concurrency and rate limits, through an on-disk HTTP cache
+(http_cache.py) that revalidates unchanged pages with conditional requests,
+and parsed in a process pool by
+price_extraction.py so parsing never stalls the fetch loop. Point --base-url at a local stub (see
+stub_market_server.py) to exercise a run without touching the real site.
 """
+import argparse
+import asyncio
 import requests
-from bs4 import BeautifulSoup
-import csv
-import time
-import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from urllib.parse import quote
 
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.core.config import get_settings  # noqa: E402
+from app.services.partitions import append_observations  # noqa: E402
+from http_cache import HttpCache  # noqa: E402
+from price_extraction import extract_price  # noqa: E402
+from scrape_engine import FetchJob, FetchResult, ScrapeEngine  # noqa: E402
+
+MARKET_URL = "https://market.yandex.ru"
+
 # Products to scrape
 PRODUCTS = {
     "Bread": "хлеб белый",
@@ -36,34 +58,32 @@ HEADERS = {
 }
 
 
+def search_url(product_query, region_id, base_url=MARKET_URL):
+    return f"{base_url}/search?text={quote(product_query)}&lr={region_id}"
+
+
+def unit_for(product_name):
+    if product_name in ["Bread", "Chicken Breast", "Tomatoes", "Cucumbers", "Bananas"]:
+        return "RUB/kg"
+    elif product_name == "Milk":
+        return "RUB/l"
+    elif product_name == "Eggs":
+        return "RUB/10pcs"
+    return "RUB"
+
+
 def scrape_product_price(product_query, region_id):
     """Scrape price for a product in a specific region."""
     try:
-        url = f"https://market.yandex.ru/search?text={quote(product_query)}&lr={region_id}"
+        url = search_url(product_query, region_id)
         
         response = requests.get(url, headers=HEADERS, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'lxml')
-        
-        # Try multiple selectors to find price
-        price_selectors = [
-            '[data-auto="snippet-price-current"]',
-            '[data-auto="mainPrice"]',
-            'span[data-auto="snippet-price"]',
-            'div[data-zone-name="price"] span',
-        ]
-        
-        for selector in price_selectors:
-            price_elem = soup.select_one(selector)
-            if price_elem:
-                price_text = price_elem.get_text(strip=True)
-                # Extract numeric price
-                price_str = ''.join(c for c in price_text if c.isdigit() or c == '.')
-                if price_str:
-                    price = float(price_str)
-                    print(f"  ✓ Found price: {price} RUB")
-                    return price
+        price = extract_price(response.text)
+        if price is not None:
+            print(f"  ✓ Found price: {price} RUB")
+            return price
         
         print(f"  ⚠ Could not find price in HTML")
         return None
@@ -73,54 +93,97 @@ def scrape_product_price(product_query, region_id):
         return None
 
 
-def main():
-    """Main scraping function."""
-    print("🔍 Starting Yandex Market scraper...\n")
-    
+async def scrape_all(engine, base_url=MARKET_URL, parse_workers=None):
+    """Fetch every product × region page concurrently and parse the prices.
+
+    Each page is handed to the parse pool as soon as it arrives.
+    """
+    jobs = [
+        FetchJob(search_url(query, region_id, base_url), tag=(product_name, region_name))
+        for product_name, query in PRODUCTS.items()
+        for region_name, region_id in REGIONS.items()
+    ]
+    loop = asyncio.get_running_loop()
+    parsed = {}
+    done = 0
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        def report(result: FetchResult):
+            nonlocal done
+            done += 1
+            product_name, region_name = result.job.tag
+            state = "✓" if result.ok else f"✗ {result.error}"
+            print(f"  [{done}/{len(jobs)}] {product_name} / {region_name}: {state}")
+            if result.ok:
+                parsed[result.job.tag] = loop.run_in_executor(pool, extract_price, result.text)
+
+        await engine.run(jobs, on_result=report)
+        prices = dict(zip(parsed, await asyncio.gather(*parsed.values())))
+
     results = []
     current_date = datetime.now().strftime("%Y-%m-%d")
+    for job in jobs:
+        product_name, region_name = job.tag
+        if job.tag not in prices:
+            continue
+        price = prices[job.tag]
+        if price is None:
+            print(f"  ⚠ Could not find price for {product_name} in {region_name}")
+            continue
+        results.append({
+            "date": current_date,
+            "region": region_name,
+            "commodity": product_name,
+            "price": price,
+            "unit": unit_for(product_name),
+        })
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default=MARKET_URL, help="Market site (or local stub) to scrape")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel requests per host")
+    parser.add_argument("--rate", type=float, default=1.0, help="Requests per second per host")
+    parser.add_argument("--burst", type=int, default=2, help="Token bucket size")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per page on errors/429/5xx")
+    parser.add_argument("--cache-dir", default=".scrape_cache", help="HTTP cache directory")
+    parser.add_argument("--cache-ttl", type=float, default=6 * 3600, help="Seconds a cached page is used without revalidation")
+    parser.add_argument("--cache-max-mb", type=float, default=64, help="Cache size limit; least recently used pages go first")
+    parser.add_argument("--no-cache", action="store_true", help="Always download every page")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Processes for HTML parsing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main scraping function."""
+    args = parse_args(argv)
+    print("🔍 Starting Yandex Market scraper...\n")
     
-    for product_name, query in PRODUCTS.items():
-        print(f"\n📦 Scraping: {product_name} ({query})")
-        
-        for region_name, region_id in REGIONS.items():
-            print(f"  🌍 {region_name}...", end=" ")
-            
-            price = scrape_product_price(query, region_id)
-            
-            if price:
-                # Determine unit
-                if product_name in ["Bread", "Chicken Breast", "Tomatoes", "Cucumbers", "Bananas"]:
-                    unit = "RUB/kg"
-                elif product_name == "Milk":
-                    unit = "RUB/l"
-                elif product_name == "Eggs":
-                    unit = "RUB/10pcs"
-                else:
-                    unit = "RUB"
-                
-                results.append({
-                    "date": current_date,
-                    "region": region_name,
-                    "commodity": product_name,
-                    "price": price,
-                    "unit": unit,
-                })
-            
-            # Be nice to the server
-            time.sleep(random.uniform(1, 3))
+    cache = None
+    if not args.no_cache:
+        cache = HttpCache(args.cache_dir, ttl=args.cache_ttl, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    engine = ScrapeEngine(
+        headers=HEADERS,
+        per_host_concurrency=args.concurrency,
+        rate=args.rate,
+        burst=args.burst,
+        retries=args.retries,
+        cache=cache,
+    )
+    results = asyncio.run(scrape_all(engine, args.base_url, args.parse_workers))
+    print(f"\n📊 {engine.stats.summary()}")
+    if cache is not None:
+        print(f"🗄  {cache.stats.summary()}")
     
-    # Save to CSV
+    # Append to partitions
     if results:
-        csv_path = "app/data/sample_prices.csv"
-        print(f"\n💾 Saving {len(results)} records to {csv_path}")
+        partitions_path = get_settings().partitions_path
+        print(f"\n💾 Appending {len(results)} records to {partitions_path}")
         
-        with open(csv_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["date", "region", "commodity", "price", "unit"])
-            writer.writeheader()
-            writer.writerows(results)
+        written = append_observations(pd.DataFrame(results), partitions_path)
         
-        print(f"✅ Done! Scraped {len(results)} prices from Yandex Market")
+        print(f"✅ Done! Scraped {len(results)} prices from Yandex Market ({len(written)} new)")
     else:
         print("\n❌ No prices were scraped. Market may have changed structure or blocked request.")
 
@@ -0,0 +1,77 @@
+"""
+Local stand-in for the Yandex Market search page, for exercising the scraper.
+
+Serves fixtures/yandex_search.html for every /search request, with an ETag
+and Last-Modified so conditional requests get 304s:
+
+    python scripts/stub_market_server.py --port 8765 --delay 0.05 --fail-rate 0.2
+    python scripts/scrape_yandex_market.py --base-url http://127.0.0.1:8765 --rate 50
+"""
+import argparse
+import hashlib
+import random
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def make_handler(page: bytes, delay: float, fail_rate: float):
+    etag = '"%s"' % hashlib.sha1(page).hexdigest()
+    last_modified = formatdate(time.time(), usegmt=True)
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)
+            if not self.path.startswith("/search"):
+                self._send(404, b"not found")
+            elif random.random() < fail_rate:
+                self._send(503, b"try again")
+            elif self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", {"ETag": etag})
+            else:
+                self._send(200, page, {"ETag": etag, "Last-Modified": last_modified})
+
+        def _send(self, status, body, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def serve(port=8765, fixture="yandex_search.html", delay=0.0, fail_rate=0.0):
+    page = (FIXTURES / fixture).read_bytes()
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(page, delay, fail_rate))
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fixture search pages for the scraper")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixture", default="yandex_search.html")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before each response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.fixture, args.delay, args.fail_rate)
+    print(f"Serving {args.fixture} on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,32 @@
 """
 Food Price Anomaly Tracker - Headless CLI Mode
 (When running headless or testing; use gui.py for GUI mode)
+
+Pass --arrow to fetch prices and anomalies as Arrow IPC streams and load them
+straight into pandas DataFrames (requires pyarrow and pandas).
 """
 
+import argparse
 import requests
 from datetime import datetime
 from tabulate import tabulate
 
 API_URL = "http://localhost:8000/api"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+def fetch_arrow(path, params=None, timeout=30):
+    """GET an endpoint as an Arrow IPC stream and return a DataFrame."""
+    import pyarrow as pa
+
+    resp = requests.get(
+        f"{API_URL}{path}",
+        params=params,
+        headers={"Accept": ARROW_STREAM},
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    return pa.ipc.open_stream(resp.content).read_pandas()
 
 
 def fetch_commodities():
@@ -33,9 +52,11 @@ def fetch_regions():
         return []
 
 
-def fetch_prices(commodity, region):
+def fetch_prices(commodity, region, arrow=False):
     """Fetch prices for a commodity in a region."""
     try:
+        if arrow:
+            return fetch_arrow("/prices", {"commodity": commodity, "region": region})
         resp = requests.get(
             f"{API_URL}/prices",
             params={"commodity": commodity, "region": region},
@@ -48,19 +69,18 @@ def fetch_prices(commodity, region):
         return []
 
 
-def fetch_anomalies(commodity, region, window=12, z=2.0):
+def fetch_anomalies(commodity, region, window=12, z=2.0, arrow=False):
     """Fetch anomalies for a commodity in a region."""
+    params = {
+        "commodity": commodity,
+        "region": region,
+        "window": window,
+        "z": z,
+    }
     try:
-        resp = requests.get(
-            f"{API_URL}/anomalies",
-            params={
-                "commodity": commodity,
-                "region": region,
-                "window": window,
-                "z": z,
-            },
-            timeout=5,
-        )
+        if arrow:
+            return fetch_arrow("/anomalies", params)
+        resp = requests.get(f"{API_URL}/anomalies", params=params, timeout=5)
         resp.raise_for_status()
         return resp.json().get("points", [])
     except Exception as e:
@@ -68,7 +88,21 @@ def fetch_anomalies(commodity, region, window=12, z=2.0):
         return []
 
 
+def fetch_price_table():
+    """Download the whole price table as one DataFrame (Arrow only)."""
+    try:
+        return fetch_arrow("/prices/export", timeout=120)
+    except Exception as e:
+        print(f"Error fetching price table: {e}")
+        return None
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Food Price Anomaly Tracker CLI")
+    parser.add_argument("--arrow", action="store_true", help="Fetch data as Arrow IPC instead of JSON")
+    parser.add_argument("--table", action="store_true", help="Download the full price table (implies --arrow)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Food Price Anomaly Tracker - CLI")
     print("=" * 60)
@@ -84,21 +118,28 @@ def main():
     print(f"\nAvailable commodities: {', '.join(commodities)}")
     print(f"Available regions: {', '.join(regions)}")
 
+    if args.table:
+        table = fetch_price_table()
+        if table is not None:
+            print(f"\nFull price table: {len(table)} rows")
+            print(table.groupby(["commodity", "region"], observed=True)["price"].describe().to_string())
+        return
+
     # Example: Show prices and anomalies for Moscow, Bread
     commodity = "Bread"
     region = "Moscow"
 
     print(f"\n--- {commodity} in {region} ---")
 
-    prices = fetch_prices(commodity, region)
-    if prices:
+    prices = fetch_prices(commodity, region, arrow=args.arrow)
+    if len(prices):
         print("\nPrice History:")
-        print(tabulate(prices, headers="keys", tablefmt="grid"))
+        print(tabulate(prices, headers="keys", tablefmt="grid", showindex=False))
 
-    anomalies = fetch_anomalies(commodity, region, window=12, z=2.0)
-    if anomalies:
+    anomalies = fetch_anomalies(commodity, region, window=12, z=2.0, arrow=args.arrow)
+    if len(anomalies):
         print("\nDetected Anomalies (z > 2.0):")
-        print(tabulate(anomalies, headers="keys", tablefmt="grid"))
+        print(tabulate(anomalies, headers="keys", tablefmt="grid", showindex=False))
     else:
         print("\nNo anomalies detected.")
 